@@ -0,0 +1,1907 @@
+# bpy-free modelbin (Grub bundle) decoding; used by modelbin_importer.py and headless tools
+from collections import ChainMap, OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+import hashlib
+import json
+import mmap
+import numpy as np
+import os
+import struct
+import sys
+import time
+from uuid import UUID
+
+# session settings, assigned by the consumer
+path_resolver = None # GamePathResolver, required when use_materials == True
+use_materials = False
+shader_processor = 1 # 0 - none, 1 - per-shader, 2 - universal shader # when use_materials == True
+use_mmap = True # map files instead of reading them, only the touched blobs are paged in
+mesh_cache_path = None # directory for decoded meshes (.npz), None - don't cache
+bake_transforms = True # False - vertices stay in bone space, DecodedMesh.transform holds the bone transform
+decode_morph_channels = False # fill MeshVertices.morph_channels, e.g. for shape keys
+keep_vertex_elements = False # fill MeshVertices.elements, e.g. for exporters that take normalized integers; meshes are not cached
+raw_vertex_elements = False # only MeshVertices.elements and .dequantization, no per-vertex decoding; meshes are not cached
+profiler = None # Profiler, None - no instrumentation
+
+# IOSys module
+class BinaryStream:
+    # cursor over a memoryview; slices and sub-streams share the parent buffer instead of copying it
+    _u8 = struct.Struct("<B")
+    _s16 = struct.Struct("<h")
+    _u16 = struct.Struct("<H")
+    _s32 = struct.Struct("<i")
+    _u32 = struct.Struct("<I")
+    _f16 = struct.Struct("<e")
+    _f32 = struct.Struct("<f")
+
+    def __init__(self, buffer): # bytes, bytearray or memoryview
+        self._buffer = memoryview(buffer)
+        self._position = 0
+    
+    @staticmethod
+    def from_path(path: str):
+        with profile("read"), open(path, "rb", 0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if profiler is not None:
+                profiler.bytes_read += size # mapped files count in full, though only the touched pages are read
+            if use_mmap and size != 0:
+                return BinaryStream(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)) # stays valid after close
+            return BinaryStream(f.read())
+    
+    def __getitem__(self, key: slice):
+        return self._buffer[key]
+    
+    def __len__(self):
+        return len(self._buffer)
+    
+    def tell(self):
+        return self._position
+    
+    def seek(self, offset: int, whence: int = 0):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += len(self._buffer)
+        self._position = offset
+        return offset
+    
+    def substream(self, offset: int, size: int | None = None):
+        return BinaryStream(self._buffer[offset : None if size is None else offset + size])
+    
+    def read_view(self, size: int | None = None):
+        start = self._position
+        end = len(self._buffer) if size is None or size < 0 else start + size
+        view = self._buffer[start : end]
+        self._position = start + len(view)
+        return view
+    
+    def read(self, size: int | None = None):
+        return self.read_view(size).tobytes()
+    
+    def read_struct(self, s: struct.Struct):
+        position = self._position
+        if position + s.size > len(self._buffer):
+            self._position = max(position, len(self._buffer))
+            return None
+        self._position = position + s.size
+        return s.unpack_from(self._buffer, position)
+    
+    def read_array(self, fmt: str, count: int): # struct format character, e.g. "H"
+        dtype = np.dtype("<" + fmt)
+        array = np.frombuffer(self._buffer, dtype, count, self._position)
+        self._position += dtype.itemsize * count
+        return array
+    
+    def _read(self, s: struct.Struct): # single value of a read_struct
+        values = self.read_struct(s)
+        return None if values is None else values[0]
+    
+    def read_string(self):
+        length = self.read_u32()
+        return self.read_view(length).tobytes().decode("utf-8")
+
+    def read_7bit_string(self):
+        length = self.read_7bit()
+        return self.read_view(length).tobytes().decode("utf-8")
+    
+    def read_s16(self):
+        return self._read(self._s16)
+    
+    def read_u8(self):
+        return self._read(self._u8)
+    
+    def read_u16(self):
+        return self._read(self._u16)
+    
+    def read_s32(self):
+        return self._read(self._s32)
+    
+    def read_u32(self):
+        return self._read(self._u32)
+    
+    def read_f16(self):
+        return self._read(self._f16)
+    
+    def read_f32(self):
+        return self._read(self._f32)
+    
+    def read_sn16(self):
+        return self.read_s16() / 32767
+    
+    def read_un8(self):
+        return self.read_u8() / 255
+    
+    def read_un16(self):
+        return self.read_u16() / 65535
+    
+    def read_7bit(self):
+        value = 0
+        shift = 0
+        while True:
+            value_byte = self.read_u8()
+            value |= (value_byte & 0x7F) << shift
+            shift += 7
+            if value_byte & 0x80 == 0:
+                break
+        return value
+
+    # Deserialize<std::vector<std::string>>()
+    # Deserialize<std::vector<T>>(T &obj) # T is ISerializable
+    #   obj.Deserialize()
+
+# Utils
+class GamePathResolver:
+    # "game:" paths -> files, case-insensitive (rips keep the game's casing, Linux file systems don't ignore it)
+    def __init__(self, path):
+        self.path = path # base, or any directory below it
+        self.root = None # "game:" mount point, found on first resolve()
+        self.directories = {} # directory -> {lowercase name: name}
+        self.resolved = {} # lowercase "game:" path -> path, None if missing
+    
+    def find_root(self):
+        # first directory from path upwards that contains "media" (C:\media\abc\media\cars -> "game:"="C:\media\abc")
+        directory = os.path.abspath(self.path)
+        while True:
+            if "media" in self.list_directory(directory):
+                return directory
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return os.path.abspath(self.path) # assume that "game:"=path
+            directory = parent
+    
+    def list_directory(self, directory):
+        entries = self.directories.get(directory)
+        if entries is None:
+            try:
+                entries = {name.lower(): name for name in os.listdir(directory)}
+            except OSError:
+                entries = {}
+            self.directories[directory] = entries
+        return entries
+    
+    def resolve(self, path):
+        key = path.lower().replace("/", "\\")
+        if key in self.resolved:
+            return self.resolved[key]
+        if key[:5] != "game:":
+            print("Warning: Swatchbin path doesn't start with \"Game:\".")
+        if self.root is None:
+            self.root = self.find_root()
+        resolved = self.root
+        for name in key[5:].split("\\"):
+            if name == "":
+                continue
+            name = self.list_directory(resolved).get(name)
+            if name is None:
+                print(F"Warning: \"{path}\" not found.")
+                resolved = None
+                break
+            resolved = os.path.join(resolved, name)
+        self.resolved[key] = resolved
+        return resolved
+        # what if game:\media\a.materialbin and c:\media\cars\a.modelbin?
+
+def find_files(path: str, extension: str): # recursive, extension is case-insensitive
+    paths = []
+    for directory, _, file_names in os.walk(path):
+        for file_name in file_names:
+            if file_name.lower().endswith(extension):
+                paths.append(os.path.join(directory, file_name))
+    paths.sort()
+    return paths
+
+class Profiler:
+    # opt-in phase timings per file and per mesh; phases nest, an outer phase includes its inner ones
+    def __init__(self):
+        self.records = [] # (file, mesh, phase, seconds, bytes read, allocated blocks)
+        self.counters = defaultdict(int) # name -> total, e.g. vertices shared between meshes
+        self.file = ""
+        self.bytes_read = 0
+    
+    @contextmanager
+    def phase(self, name: str, mesh: str = ""):
+        # allocated blocks: net change of the interpreter's live memory blocks, roughly the objects left behind
+        bytes_read = self.bytes_read
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((self.file, mesh, name, time.perf_counter() - start, self.bytes_read - bytes_read, sys.getallocatedblocks() - blocks))
+    
+    @contextmanager
+    def file_phase(self, path: str):
+        # "file" phase; records inside it are attributed to path
+        previous = self.file
+        self.file = path
+        try:
+            with self.phase("file"):
+                yield
+        finally:
+            self.file = previous
+    
+    def count(self, name: str, value: int):
+        self.counters[name] += value
+    
+    def take(self):
+        # records and counters so far, cleared; what a decode worker hands over to merge()
+        taken = (self.records, dict(self.counters))
+        self.records = []
+        self.counters = defaultdict(int)
+        return taken
+    
+    def merge(self, taken):
+        records, counters = taken
+        self.records.extend(records)
+        for name, value in counters.items():
+            self.counters[name] += value
+    
+    def summary(self):
+        phases = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0, "blocks": 0})
+        files = defaultdict(lambda: {"seconds": 0.0, "bytes": 0, "blocks": 0})
+        meshes = defaultdict(float) # (file, mesh) -> seconds
+        for file, mesh, name, seconds, bytes_read, blocks in self.records:
+            totals = phases[name]
+            totals["count"] += 1
+            totals["seconds"] += seconds
+            totals["bytes"] += bytes_read
+            totals["blocks"] += blocks
+            if name == "file":
+                files[file]["seconds"] += seconds
+                files[file]["bytes"] += bytes_read
+                files[file]["blocks"] += blocks
+            if mesh != "":
+                meshes[(file, mesh)] += seconds
+        return {
+            "phases": dict(phases),
+            "files": dict(files),
+            "meshes": [{"file": file, "mesh": mesh, "seconds": seconds} for (file, mesh), seconds in sorted(meshes.items(), key=lambda item: -item[1])],
+            "counters": dict(self.counters),
+        }
+    
+    def print_summary(self, slowest_meshes: int = 10):
+        summary = self.summary()
+        print(F"{'phase':<16}{'count':>8}{'seconds':>12}{'MiB read':>12}{'blocks':>12}")
+        for name, totals in sorted(summary["phases"].items(), key=lambda item: -item[1]["seconds"]):
+            print(F"{name:<16}{totals['count']:>8}{totals['seconds']:>12.3f}{totals['bytes'] / (1 << 20):>12.1f}{totals['blocks']:>12}")
+        print(F"{len(summary['files'])} files, {sum(totals['seconds'] for totals in summary['files'].values()):.3f} s")
+        for name, value in summary["counters"].items():
+            print(F"{name}: {value}")
+        for mesh in summary["meshes"][:slowest_meshes]:
+            print(F"  {mesh['seconds']:.3f} s {os.path.basename(mesh['file'])}: {mesh['mesh']}")
+    
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump({
+                "records": [dict(zip(("file", "mesh", "phase", "seconds", "bytes", "blocks"), record)) for record in self.records],
+                "summary": self.summary(),
+            }, f, indent=1)
+
+def profile(phase: str, mesh: str = ""):
+    return nullcontext() if profiler is None else profiler.phase(phase, mesh)
+
+def profile_file(path: str):
+    return nullcontext() if profiler is None else profiler.file_phase(path)
+
+# Bundle module
+class Tag: # enum CommonModel::Serialization::Tags::Enum; Bundle::BlobTag?
+    # bundle
+    Grub = 0x47727562 # 'Grub'; BundleTag
+    
+    # metadata
+    Id = 0x49642020 # 'Id  '
+    Name = 0x4E616D65 # 'Name'
+
+    TXCH = 0x54584348 # 'TXCH'
+    
+    # blob
+    Modl = 0x4D6F646C # 'Modl'
+    Skel = 0x536B656C # 'Skel'
+    MatI = 0x4D617449 # 'MatI'
+    Mesh = 0x4D657368 # 'Mesh'
+    VLay = 0x564C6179 # 'VLay'
+    IndB = 0x496E6442 # 'IndB'
+    VerB = 0x56657242 # 'VerB'
+    MBuf = 0x4D427566 # 'MBuf'
+
+    MATI = 0x4D415449
+    MATL = 0x4D41544C
+    MTPR = 0x4D545052 # 'MTPR'
+    DFPR = 0x44465052
+
+    TXCB = 0x54584342 # 'TXCB'
+
+class Version:
+    def __init__(self):
+        self.major = 0
+        self.minor = 0
+    
+    def deserialize(self, stream: BinaryStream):
+        self.major = stream.read_u8()
+        self.minor = stream.read_u8()
+    
+    def is_at_least(self, major, minor):
+        return self.major > major or self.major == major and self.minor >= minor
+    
+    def is_at_most(self, major, minor):
+        return self.major < major or self.major == major and self.minor <= minor
+    
+    def is_equal(self, major, minor):
+        return self.major == major and self.minor == minor
+
+class Metadata:
+    header = struct.Struct("<IHH")
+
+    def __init__(self):
+        self.tag = 0
+        self.version = 0
+    
+    def deserialize(self, stream: BinaryStream):
+        start = stream.tell()
+        self.tag, version_and_size, offset = stream.read_struct(self.header)
+        self.version = version_and_size & 0xF
+        size = version_and_size >> 4
+        self.stream = stream.substream(start + offset, size)
+    
+    # the value is the whole stream, read from the start so that a bundle can be read more than once
+    def read_string(self):
+        self.stream.seek(0)
+        return self.stream.read().decode('utf-8')
+    
+    def read_s32(self):
+        self.stream.seek(0)
+        return self.stream.read_s32()
+
+class Blob:
+    # only the blob table entry is read up front, metadata and data are materialized on first access
+    header = struct.Struct("<IBBHIII4x")
+
+    def __init__(self):
+        self.tag = 0
+        self.version = Version()
+        self.metadata_length = 0
+        self.metadata_offset = 0
+        self.data_offset = 0
+        self.data_size = 0
+        self._bundle_stream = None
+        self._metadata = None
+        self._stream = None
+    
+    def deserialize(self, stream: BinaryStream):
+        (self.tag, self.version.major, self.version.minor, self.metadata_length,
+            self.metadata_offset, self.data_offset, self.data_size) = stream.read_struct(self.header)
+        self._bundle_stream = stream
+    
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = {}
+            metadata_stream = self._bundle_stream.substream(self.metadata_offset)
+            for i in range(0, self.metadata_length):
+                metadata = Metadata()
+                metadata.deserialize(metadata_stream)
+                self._metadata[metadata.tag] = metadata
+        return self._metadata
+    
+    @property
+    def stream(self):
+        if self._stream is None:
+            self._stream = self._bundle_stream.substream(self.data_offset, self.data_size)
+        return self._stream
+
+class Bundle:
+    def __init__(self):
+        self.tag = 0
+        self.version = Version()
+        self.blobs_length = 0
+        self.blobs = defaultdict(list) # std::unordered_multimap<uint32_t, Blob>
+    
+    def deserialize(self, stream: BinaryStream):
+        self.tag = stream.read_u32()
+        if self.tag != Tag.Grub:
+            print("Warning: Bundle has invalid tag. Expected 'Grub'.")
+        self.version.deserialize(stream)
+        if not self.version.is_at_most(1, 1):
+            print(F"Warning: Unsupported version. Found: {self.version.major}.{self.version.minor}. Max supported: 1.1")
+        self.blobs_length = stream.read_u16()
+        stream.seek(4 * 2, os.SEEK_CUR)
+        if self.version.is_at_least(1, 1):
+            self.blobs_length = stream.read_u32()
+        for _ in range(self.blobs_length):
+            blob = Blob()
+            blob.deserialize(stream)
+            self.blobs[blob.tag].append(blob)
+    
+    @staticmethod
+    def read_header(f):
+        # reads only the part of the file in front of the first blob data: header, blob table and metadata
+        # Blob.stream of the result is empty, read the data from f at Blob.data_offset
+        prefix = f.read(0x14)
+        version = Version()
+        version.major, version.minor = prefix[4], prefix[5]
+        if version.is_at_least(1, 1):
+            blobs_length, = struct.unpack_from("<I", prefix, 0x10)
+            table_offset = 0x14
+        else:
+            blobs_length, = struct.unpack_from("<H", prefix, 6)
+            table_offset = 0x10
+        f.seek(table_offset)
+        table = f.read(Blob.header.size * blobs_length)
+        header_size = max(table_offset + len(table), min((entry[5] for entry in Blob.header.iter_unpack(table) if entry[6] != 0), default=0))
+        f.seek(0)
+        bundle = Bundle()
+        bundle.deserialize(BinaryStream(f.read(header_size)))
+        return bundle
+
+class Model: # CommonModel::Model
+    def __init__(self):
+        self.meshes_length = 0
+        self.buffers_length = 0
+        self.vertex_layouts_length = 0
+        self.materials_length = 0
+        # self.lowest_level_of_detail = 0
+        # self.highest_level_of_detail = 0
+        self.levels_of_detail = 0 # LODFlags
+        self.decompress_flags = 0
+    
+    def deserialize(self, blob: Blob):
+        # read metadata?
+
+        stream = blob.stream
+        self.meshes_length = stream.read_s16()
+        self.buffers_length = stream.read_s16()
+        self.vertex_layouts_length = stream.read_s16()
+        self.materials_length = stream.read_s16()
+        stream.seek(4, os.SEEK_CUR)
+        self.levels_of_detail = stream.read_u16()
+        if blob.version.is_at_least(1, 2):
+            self.decompress_flags = stream.read_u8()
+            # stream.seek(1, os.SEEK_CUR)
+        # if blob.version.is_at_least(1, 3):
+        #     stream.seek(1 * 2, os.SEEK_CUR)
+
+class D3D12_INPUT_ELEMENT_DESC:
+    def __init__(self):
+        self.semantic_name = ""
+        self.semantic_index = 0
+        self.input_slot = 0
+        self.format = 0
+
+class VertexLayout: # CommonModel::VertexLayout
+    def __init__(self):
+        self.element_names_length = 0
+        self.element_names = None
+        self.elements_length = 0
+        self.elements = defaultdict(D3D12_INPUT_ELEMENT_DESC)
+        # self.semantics = 0 # bitfield
+    
+    def deserialize(self, stream: BinaryStream):
+        self.element_names_length = stream.read_u16()
+        self.element_names = [None] * self.element_names_length
+        for i in range(self.element_names_length):
+            self.element_names[i] = stream.read_string()
+        self.elements_length = stream.read_u16()
+        # self.elements = [D3D12_INPUT_ELEMENT_DESC()] * self.elements_length # std::vector<D3D12_INPUT_ELEMENT_DESC>
+        for i in range(self.elements_length):
+            # self.elements[i].semantic_name = self.element_names[stream.read_u16()]
+            self.semantic_name = self.element_names[stream.read_u16()]
+            self.semantic_index = stream.read_u16()
+            element = self.elements[self.semantic_name + str(self.semantic_index)] # TEXCOORD0, TEXCOORD1, ...
+            element.input_slot = stream.read_u16()
+            stream.seek(2, os.SEEK_CUR)
+            element.format = stream.read_u32()
+            stream.seek(4 * 2, os.SEEK_CUR)
+        # stream.seek(4 * self.elements_length, os.SEEK_CUR) # PackedFormats
+        # if blob.version.is_at_least(1, 1):
+        #     self.semantics = stream.read_u32()
+
+class ModelBuffer: # CommonModel::ModelBuffer
+    def __init__(self):
+        self.length = 0
+        self.size = 0
+        self.stride = 0
+        # self.elements_length = 0
+        self.format = 0
+    
+    def deserialize(self, blob: Blob):
+        self.length = blob.stream.read_u32()
+        self.size = blob.stream.read_u32()
+        self.stride = blob.stream.read_u16()
+        blob.stream.seek(1 + 1, os.SEEK_CUR)
+        if blob.version.is_at_least(1, 0):
+            self.format = blob.stream.read_u32()
+            self.stream = blob.stream[0x10 : 0x10 + self.size]
+        else:
+            self.stream = blob.stream[0xC : 0xC + self.size]
+    
+    def indices(self): # IndB only; typed view, no data is copied
+        return np.frombuffer(self.stream, np.uint32 if self.stride == 4 else np.uint16, len(self.stream) // self.stride)
+
+class Mesh_VertexBufferIndex:
+    def __init__(self):
+        self.id = 0
+        # self.input_slot = 0
+        self.stride = 0
+        self.offset = 0
+
+class Mesh: # CommonModel::Mesh
+    def __init__(self):
+        self.material_id = 0
+        self.bone_index = 0
+        self.levels_of_detail = 0
+        self.render_pass = 0
+        self.skinning_elements_count = 0
+        self.morph_weights_count = 0
+        self.index_buffer_id = 0
+        self.start_index_location = 0
+        self.base_vertex_location = 0
+        self.index_count = 0
+        self.morph_data_buffer_id = None # None before Mesh 1.4
+        self.skinning_data_buffer_id = None
+        self.uv_transforms = [None] * 5
+        self.scale = [1, 1, 1, 1] # identity before Mesh 1.8
+        self.translate = [0, 0, 0, 0]
+    
+    def deserialize(self, blob: Blob):
+        self.name = blob.metadata[Tag.Name].read_string()
+
+        self.material_id = blob.stream.read_s16()
+        if blob.version.is_at_least(1, 9):
+            self.material_id = blob.stream.read_s16()
+            blob.stream.seek(2 * 2, os.SEEK_CUR)
+        self.bone_index = blob.stream.read_s16()
+        self.levels_of_detail = blob.stream.read_u16()
+        blob.stream.seek(2, os.SEEK_CUR)
+        self.render_pass = blob.stream.read_u16()
+        blob.stream.seek(1, os.SEEK_CUR)
+        if blob.version.is_at_least(1, 2):
+            self.skinning_elements_count = blob.stream.read_u8()
+            self.morph_weights_count = blob.stream.read_u8()
+        if blob.version.is_at_least(1, 3):
+            blob.stream.seek(1, os.SEEK_CUR)
+        blob.stream.seek(1 + 2, os.SEEK_CUR)
+        self.index_buffer_id = blob.stream.read_s32()
+        blob.stream.seek(4, os.SEEK_CUR)
+        self.start_index_location = blob.stream.read_s32()
+        self.base_vertex_location = blob.stream.read_s32()
+        self.index_count = blob.stream.read_u32()
+        blob.stream.seek(4, os.SEEK_CUR)
+        if blob.version.is_at_least(1, 6):
+            blob.stream.seek(4 + 4, os.SEEK_CUR)
+        self.vertex_layout_id = blob.stream.read_u32()
+        self.vertex_buffer_indices_length = blob.stream.read_u32()
+        self.vertex_buffer_indices = [None] * self.vertex_buffer_indices_length
+        for i in range(0, self.vertex_buffer_indices_length):
+            vertex_buffer_index = Mesh_VertexBufferIndex()
+            vertex_buffer_index.id = blob.stream.read_s32()
+            input_slot = blob.stream.read_s32()
+            vertex_buffer_index.stride = blob.stream.read_s32()
+            vertex_buffer_index.offset = blob.stream.read_s32()
+            self.vertex_buffer_indices[input_slot] = vertex_buffer_index
+        if blob.version.is_at_least(1, 4):
+            self.morph_data_buffer_id = blob.stream.read_s32()
+            self.skinning_data_buffer_id = blob.stream.read_s32()
+        self.constant_buffer_indices_length = blob.stream.read_u32()
+        if self.constant_buffer_indices_length != 0:
+            print("Warning: Mesh.constant_buffer_indices_length != 0. Please report it in GitHub issue.")
+            # throw exception
+        if blob.version.is_at_least(1, 1):
+            blob.stream.seek(4, os.SEEK_CUR)
+        if blob.version.is_at_least(1, 5):
+            for i in range(5):
+                self.uv_transforms[i] = ((blob.stream.read_f32(), blob.stream.read_f32()), (blob.stream.read_f32(), blob.stream.read_f32()))
+        if blob.version.is_at_least(1, 8):
+            self.scale = [blob.stream.read_f32(), blob.stream.read_f32(), blob.stream.read_f32(), blob.stream.read_f32()]
+            self.translate = [blob.stream.read_f32(), blob.stream.read_f32(), blob.stream.read_f32(), blob.stream.read_f32()]
+
+class ModelIndex:
+    # per-bundle mesh table: LOD mask, render pass, buffers and material of every mesh; only the Mesh blobs are read
+    # so that a decode only deserializes the vertex buffers, morph buffers and materials of the meshes it draws
+    def __init__(self, bundle: Bundle):
+        mesh_blobs = bundle.blobs[Tag.Mesh]
+        self.meshes = [Mesh() for _ in range(len(mesh_blobs))]
+        for mesh, mesh_blob in zip(self.meshes, mesh_blobs):
+            mesh.deserialize(mesh_blob)
+    
+    @staticmethod
+    def drawable(mesh: Mesh):
+        return mesh.render_pass & 0x10 != 0 and mesh.index_count != 0 # 0x10: not Shadow
+    
+    def select(self, requested_level_of_detail: int = 0xFFFF, requested_render_pass: int = 0xFFFF):
+        return [mesh for mesh in self.meshes if mesh.levels_of_detail & requested_level_of_detail != 0 and mesh.render_pass & requested_render_pass != 0 and ModelIndex.drawable(mesh)]
+    
+    def levels_of_detail(self): # LOD mask of the drawable meshes, without reading geometry
+        mask = 0
+        for mesh in self.meshes:
+            if ModelIndex.drawable(mesh):
+                mask |= mesh.levels_of_detail
+        return mask
+    
+    def render_passes(self, requested_level_of_detail: int = 0xFFFF): # sorted render pass values of the drawable meshes
+        return sorted({mesh.render_pass for mesh in self.select(requested_level_of_detail)})
+    
+    @staticmethod
+    def vertex_buffer_ids(meshes):
+        return {vertex_buffer_index.id for mesh in meshes for vertex_buffer_index in mesh.vertex_buffer_indices if vertex_buffer_index is not None}
+    
+    @staticmethod
+    def morph_data_buffer_ids(meshes):
+        return {mesh.morph_data_buffer_id for mesh in meshes if mesh.morph_weights_count > 0 and mesh.morph_data_buffer_id is not None}
+    
+    @staticmethod
+    def material_ids(meshes):
+        return {mesh.material_id for mesh in meshes}
+    
+    def summary(self):
+        # per LOD bit: (bit, meshes, triangles, render passes) of the drawable meshes
+        rows = []
+        for bit in range(16):
+            meshes = self.select(1 << bit)
+            if meshes:
+                rows.append((bit, len(meshes), sum(mesh.index_count // 3 for mesh in meshes), sorted({mesh.render_pass for mesh in meshes})))
+        return rows
+
+class TextureCache: # path -> GUID -> DDS buffer; least recently used buffers are dropped above max_size bytes
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.guids = {} # path -> (mtime, guid)
+        self.buffers = OrderedDict() # guid -> buffer
+    
+    def get_guid(self, path: str, mtime: int):
+        cached = self.guids.get(path)
+        if cached is None or cached[0] != mtime:
+            return None
+        return cached[1]
+    
+    def get_buffer(self, guid: str):
+        buffer = self.buffers.get(guid)
+        if buffer is not None:
+            self.buffers.move_to_end(guid)
+        return buffer
+    
+    def add(self, path: str, mtime: int, guid: str, buffer: bytes):
+        self.guids[path] = (mtime, guid)
+        if guid in self.buffers:
+            return
+        self.buffers[guid] = buffer
+        self.size += len(buffer)
+        while self.size > self.max_size and len(self.buffers) > 1:
+            _, evicted = self.buffers.popitem(last=False)
+            self.size -= len(evicted)
+
+texture_cache = TextureCache(512 * 1024 * 1024)
+
+class Texture:
+    def __init__(self, path):
+        self.path = path
+        self.buffer = None
+        #self.buffer_size
+        self.guid = ""
+    
+    @staticmethod
+    def from_path(path: str):
+        p = path_resolver.resolve(path)
+        if p is None:
+            return None
+        t = Texture(p)
+        with profile("texture"):
+            t.deserialize()
+        return t
+    
+    def read_header(self, bundle: Bundle):
+        # TXCH -> DDS header; returns the TXCB blob and the header
+        # TODO: parse encoding and pitch parameter table properly
+        blob = bundle.blobs[Tag.TXCB][0] # TODO: create TextureContent class
+        header_stream = blob.metadata[Tag.TXCH].stream
+        header_stream.seek(4 + 4, os.SEEK_CUR)
+        self.guid = "{" + str(UUID(bytes_le=header_stream.read(16))).upper() + "}"
+        width = header_stream.read(4)
+        height = header_stream.read(4)
+        header_stream.seek(4 + 2, os.SEEK_CUR)
+        mip_levels = header_stream.read(1)
+        header_stream.seek(1, os.SEEK_CUR)
+        transcoding = header_stream.read_u32()
+        header_stream.seek(4, os.SEEK_CUR)
+        color_profile = header_stream.read_u32()
+        header_stream.seek(4 + 8, os.SEEK_CUR)
+        encoding = header_stream.read_u32()
+        header_stream.seek(8, os.SEEK_CUR)
+        linear_size = header_stream.read(4) # linear_size for compressed, pitch for uncompressed?
+        format_encoded = encoding if transcoding <= 1 else transcoding - 2
+        match format_encoded:
+            case 0:
+                format = 72 if color_profile else 71 # DXGI_FORMAT_BC1_UNORM
+            case 1:
+                format = 75 if color_profile else 74 # DXGI_FORMAT_BC2_UNORM
+            case 2:
+                format = 78 if color_profile else 77 # DXGI_FORMAT_BC3_UNORM
+            case 3:
+                format = 80 # DXGI_FORMAT_BC4_UNORM
+            case 4:
+                format = 81 # DXGI_FORMAT_BC4_SNORM
+            case 5:
+                format = 83 # DXGI_FORMAT_BC5_UNORM
+            case 6:
+                format = 84 # DXGI_FORMAT_BC5_SNORM
+            case 7:
+                format = 95 # DXGI_FORMAT_BC6H_UF16
+            case 8:
+                format = 96 # DXGI_FORMAT_BC6H_SF16
+            case 9:
+                format = 99 if color_profile else 98 # DXGI_FORMAT_BC7_UNORM
+            case 13:
+                format = 29 if color_profile else 28 # DXGI_FORMAT_R8G8B8A8_UNORM
+            case _:
+                format = 0 # DXGI_FORMAT_UNKNOWN
+                print("Warning: Unknown texture format.")
+
+        # TODO: generate DDS header using Microsoft library
+        dds_header = b''.join([
+            b'\x44\x44\x53\x20\x7C\x00\x00\x00\x07\x10\x0A\x00', height,
+            width, linear_size, b'\x01\x00\x00\x00', mip_levels, b'\x00\x00\x00'
+            b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',
+            b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',
+            b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x20\x00\x00\x00',
+            b'\x04\x00\x00\x00\x44\x58\x31\x30\x00\x00\x00\x00\x00\x00\x00\x00',
+            b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\x10\x40\x00',
+            b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',
+            struct.pack("I", format), b'\x03\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00',
+            b'\x03\x00\x00\x00'])
+        return blob, dds_header
+    
+    def deserialize(self):
+        # print("Texture: " + self.path)
+        if self.path is None: # not found by path_resolver
+            return
+        mtime = os.stat(self.path).st_mtime_ns
+        guid = texture_cache.get_guid(self.path, mtime)
+        if guid is not None:
+            self.buffer = texture_cache.get_buffer(guid)
+            if self.buffer is not None:
+                self.guid = guid
+                return
+
+        s = BinaryStream.from_path(self.path)
+
+        bundle = Bundle()
+        bundle.deserialize(s)
+
+        blob, dds_header = self.read_header(bundle)
+        self.buffer = texture_cache.get_buffer(self.guid) # same texture content under another path
+        if self.buffer is None:
+            self.buffer = b''.join([dds_header, blob.stream.read_view()]) # Image.pack doesn't support memoryview
+        texture_cache.add(self.path, mtime, self.guid, self.buffer)
+    
+    @staticmethod
+    def extract(path: str, destination, chunk_size: int = 1 << 20):
+        # swatchbin -> DDS in constant memory; destination is a binary file or a preallocated writable buffer
+        # returns the texture and the DDS size
+        texture = Texture(path)
+        with open(path, "rb", 0) as f:
+            blob, dds_header = texture.read_header(Bundle.read_header(f))
+            size = len(dds_header) + blob.data_size
+            f.seek(blob.data_offset)
+            if hasattr(destination, "write"):
+                destination.write(dds_header)
+                chunk = memoryview(bytearray(min(chunk_size, blob.data_size)))
+                remaining = blob.data_size
+                while remaining > 0:
+                    length = f.readinto(chunk[: min(chunk_size, remaining)])
+                    if not length:
+                        break
+                    destination.write(chunk[:length])
+                    remaining -= length
+            else:
+                view = memoryview(destination)
+                view[: len(dds_header)] = dds_header
+                remaining = blob.data_size - f.readinto(view[len(dds_header) : size])
+        if remaining != 0:
+            print(F"Warning: Texture data of \"{path}\" is truncated.")
+        return texture, size
+
+class ShaderParameter:
+    def __init__(self):
+        self.hash = 0
+        self.guid = None
+        self.type = 0
+        # self.value_stream = None
+    
+    def deserialize(self, stream: BinaryStream):
+        version = Version()
+        version.deserialize(stream)
+        if not version.is_at_least(2, 0):
+            print("Error: Shader Parameter versions below 2.0 are not supported.")
+        self.hash = stream.read_u32()
+        if version.is_at_least(3, 1) and stream.read_u8() != 0:
+            stream.seek(4, os.SEEK_CUR)
+        self.type = stream.read_u8()
+        if version.is_at_least(3, 0):
+            self.guid = stream.read(16)
+        # else:
+        #     print("Error: Shader Parameter versions below 3.0 are not supported (no GUID).")
+        value_start = stream.tell()
+        match self.type:
+            case 0 | 5 | 9: # Vector_ShaderParameter, Swizzle_ShaderParameter, FunctionRange_ShaderParameter
+                stream.seek(16, os.SEEK_CUR)
+            case 1: # Color_ShaderParameter
+                self.value = (stream.read_f32(), stream.read_f32(), stream.read_f32(), stream.read_f32())
+            case 2: # Float_ShaderParameter
+                self.value = stream.read_f32()
+            case 4: # Int_ShaderParameter
+                stream.seek(4, os.SEEK_CUR)
+            case 3: # Bool_ShaderParameter
+                self.value = stream.read_u32() != 0
+            case 6: # Texture2D_ShaderParameter
+                # str_length = stream.read_7bit()
+                # stream.seek(str_length + 4, os.SEEK_CUR)
+                self.path = stream.read_7bit_string()
+                stream.seek(4, os.SEEK_CUR)
+            case 7: # Sampler_ShaderParameter
+                stream.seek(4 * 2, os.SEEK_CUR)
+                if version.is_at_least(1, 1):
+                    stream.seek(4, os.SEEK_CUR)
+            case 8: # ColorGradient_ShaderParameter
+                length = stream.read_u32()
+                stream.seek(4 * length, os.SEEK_CUR)
+            case 11: # Vector2_ShaderParameter
+                self.value = (stream.read_f32(), stream.read_f32())
+                if not version.is_at_least(2, 0):
+                    stream.seek(8, os.SEEK_CUR)
+        self.value_data = stream[value_start : stream.tell()].tobytes() # a copy, cached parameters must not keep the file mapped
+
+material_cache = {} # resolved path -> MaterialSystemObject
+
+class MaterialSystemObject:
+    def __init__(self):
+        self.parameters = {} # dict, or ChainMap of own parameters over the shared parent ones
+        self.shader_name = None
+        self.file_versions = () # ((path, mtime), ...) of the file and its parents, what a cached object depends on
+    
+    def is_current(self):
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in self.file_versions)
+        except OSError: # a parent was removed
+            return False
+    
+    @staticmethod
+    def from_path(path: str):
+        # parsed once per version of the file and its parents; the result is shared, don't modify it
+        cached = material_cache.get(path)
+        if cached is not None and cached.is_current():
+            return cached
+        mtime = os.stat(path).st_mtime_ns
+        material = MaterialSystemObject()
+        material.deserialize(BinaryStream.from_path(path))
+        material.file_versions = ((path, mtime),) + material.file_versions
+        material_cache[path] = material
+        return material
+    
+    def deserialize(self, stream: BinaryStream):
+        bundle = Bundle()
+        bundle.deserialize(stream)
+
+        parent_blobs = bundle.blobs[Tag.MATI]
+        if len(parent_blobs) == 0:
+            parent_blobs = bundle.blobs[Tag.MATL]
+        if len(parent_blobs) != 0:
+            parent_blob = parent_blobs[0]
+            parent_path = parent_blob.stream.read_7bit_string()
+            f_path = path_resolver.resolve(parent_path)
+            # print("Material: " + f_path)
+            if f_path is not None: # missing parents are ignored, resolve() warns
+                parent = MaterialSystemObject.from_path(f_path)
+                self.shader_name = parent.shader_name
+                self.file_versions = parent.file_versions
+                # copy-on-write: own parameters are added to the first map, the parent's stay shared
+                parent_maps = parent.parameters.maps if isinstance(parent.parameters, ChainMap) else [parent.parameters]
+                self.parameters = ChainMap({}, *parent_maps)
+            if self.shader_name is None:
+                self.shader_name = parent_blob.metadata[Tag.Name].read_string()
+
+        shader_parameters_blobs = bundle.blobs[Tag.MTPR]
+        if len(shader_parameters_blobs) == 0:
+            shader_parameters_blobs = bundle.blobs[Tag.DFPR]
+        parameters_blob = shader_parameters_blobs[0]
+        if parameters_blob.version.is_at_least(2, 1):
+            parameters_length = parameters_blob.stream.read_u16()
+        else:
+            parameters_length = parameters_blob.stream.read_u8()
+        if not parameters_blob.version.is_at_least(2, 0):
+            print("Error: MTPR/DFPR versions below 2.0 are not supported.")
+        for i in range(parameters_length):
+            parameter = ShaderParameter()
+            parameter.deserialize(parameters_blob.stream)
+            # self.parameters[parameter.guid] = parameter
+            self.parameters[parameter.hash] = parameter
+
+class ShaderParameterName:
+    # bumperF
+    CH1DiffuseTextureTexture = 0x10350BBC
+    UseDiffuseAlphaBool = 0xD047A271
+    CH1DiffuseTextureSwitchBool = 0x7169AC81
+    CH1AlphaSwitchBool = 0xE159D67B
+    CH1AlphaTextureTexture = 0x66E53F62
+    UniqueBaseColorSwitchBool = 0xE1D827FD
+    UniqueBaseTextureSwitchBool = 0x9615CAAA
+    ColorGroupSwitchBool = 0x78004A9C
+    UniqueBaseColorColorParam = 0xEA718FBE
+    PaintColorGroupColorParam = 0x0014A502
+    PaintColorColorParam = 0xC0CB2820
+    FlakeGloss_floatVal = 0x99CC69B1
+
+    # badge
+    DiffuseTextureSwitchBool = 0x05A401E7
+    CH1MaskSwitchBool = 0x08B2C17F
+    DiffuseColorColorParam = 0x63040D89
+    
+    # emblem
+    DiffuseATexture = 0x6DD98CD9
+    CH1DiffColTextureSwitchBool = 0x04F8F9FA
+    NormalTexture = 0x8C658791
+    CH1OpacityMaskSwitchBool = 0xA6BF15E8
+    CH1OpacitySwitchBool = 0xCBB3D988
+    CH1GlossMaskSwitchBool = 0x5A0DA36A
+
+    # radiator
+    DiffuseColorGroupColorParam = 0xF51639BE
+    GlossTexture = 0x7E4A41E1
+    AlphaTexture = 0x57D9D49E
+    GlossA_floatVal = 0x52E99DA3
+    CH1NormalMapSwitchBool = 0x553D641D
+    CH1LocalAOSwitchBool = 0xE876DDCC
+
+    # clc_metalch2normalch1mask
+    CH2DiffuseTextureTexture = 0x294DA6FC
+    ColorGroupColorParam = 0x73A9E2DF
+    CH2DiffuseTextureTiling = 0x519B26A1
+    NormalTiling = 0x730F2086
+    LocalAOSwitchBool = 0x6C03F944
+    CH2NormalSwitchBool = 0x255EF28A
+
+    # ch2diffnormglossalphaemissive
+    uTile_floatVal = 0xB0B8947E
+    vTile_floatVal = 0xCCD9B1A5
+    DiffuseColorAColorParam = 0xEF5CCE09
+    CH2GlossMaskSwitchBool = 0xF5A4EEA0
+    CH2NormalMapSwitchBool = 0xFA9429D7
+    CH2OpacityMaskSwitchBool = 0x9FC7B8A8
+
+    # simplediffuse
+    ColorColorParam = 0x57C321A6
+
+    # ch1ch2normlerpch1glossdiff
+    CH1GlossDiffMaskTexture = 0x022DF609
+
+class MaterialInstance: # MaterialSystem::MaterialInstance : MaterialSystemObject
+    def __init__(self):
+        self.name = ""
+        self.valid = False
+        self.diffuse_color = (1, 1, 1, 1)
+        self.diffuse_texture = None
+        self.diffuse_texture_tiling = (1, 1)
+        self.diffuse_texture_texcoord = "TEXCOORD0"
+        self.normal_texture = None
+        self.normal_texture_tiling = (1, 1)
+        self.normal_texture_texcoord = "TEXCOORD0"
+        self.alpha_texture = None
+        self.alpha_texture_output = 0 # channel
+        self.gloss_value = None
+        self.gloss_texture = None
+        self.gloss_texture_output = 0
+        self.gloss_texture_tiling = (1, 1)
+        self.gloss_texture_texcoord = "TEXCOORD0"
+        self.gloss_invert = False
+        self.lcao_texture = None # local AO
+        self.lcao_texture_output = 0
+        self.lcao_texture_tiling = (1, 1)
+        self.lcao_texture_texcoord = "TEXCOORD0"
+        # self.ao_texture = None
+    
+    def deserialize(self, blob: Blob):
+        self.name = blob.metadata[Tag.Name].read_string()
+        
+        if not use_materials:
+            return
+        
+        material = MaterialSystemObject()
+        material.deserialize(blob.stream)
+
+        # universal:
+        # normal_texture = NormalTexture -- if no bool parameters and one NormalTexture, then normal_texture is present
+        #  if CH2NormalMapSwitchBool == false, then normal_texture = None
+        #  if CH2NormalSwitchBool == false, then normal_texture = None
+        #  if CH1NormalMapSwitchBool == false, then normal_texture = None
+        
+        # print(material.shader_name)
+        if shader_processor == 1:
+            match material.shader_name:
+                case "carpaint_standard":
+                    self.valid = True
+                    self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.CH1DiffuseTextureTexture].path))
+                    self.diffuse_texture.deserialize()
+                    self.alpha_texture = self.diffuse_texture
+                    self.alpha_texture_output = 1
+                    if material.parameters[ShaderParameterName.UniqueBaseColorSwitchBool].value and not material.parameters[ShaderParameterName.UniqueBaseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+                        self.diffuse_color = material.parameters[ShaderParameterName.UniqueBaseColorColorParam].value
+                    if not material.parameters[ShaderParameterName.CH1DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+                        if material.parameters[ShaderParameterName.ColorGroupSwitchBool].value:
+                            self.diffuse_color = material.parameters[ShaderParameterName.PaintColorGroupColorParam].value
+                        else:
+                            self.diffuse_color = material.parameters[ShaderParameterName.PaintColorColorParam].value
+                        if not material.parameters[ShaderParameterName.UseDiffuseAlphaBool].value:
+                            self.alpha_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.CH1AlphaTextureTexture].path))
+                            self.alpha_texture_output = 0
+                    if not material.parameters[ShaderParameterName.CH1AlphaSwitchBool].value:
+                        self.alpha_texture = None
+                    self.gloss_value = material.parameters[ShaderParameterName.FlakeGloss_floatVal].value # TODO: confirm in shader
+                case "badge_clc_diffuseMetalLERPCH1MaskNorm": # badge
+                    self.valid = True
+                    if material.parameters[ShaderParameterName.DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.DiffuseATexture].path))
+                        self.diffuse_texture.deserialize()
+                        self.gloss_texture = self.diffuse_texture
+                        self.gloss_texture_output = 1
+                    else:
+                        self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorColorParam].value
+                        self.gloss_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.CH1MaskTexture].path))
+                        self.gloss_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH1MaskSwitchBool].value:
+                        self.gloss_texture = None
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    if material.parameters[ShaderParameterName.CH1OpacitySwitchBool].value:
+                        self.alpha_texture = self.normal_texture
+                        self.alpha_texture_output = 1
+                case "badge_ch1difnormglossao": # emblem
+                    self.valid = True
+                    if material.parameters[ShaderParameterName.CH1DiffColTextureSwitchBool].value:
+                        self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.DiffuseATexture].path))
+                        self.diffuse_texture.deserialize()
+                        self.gloss_texture = self.diffuse_texture
+                        self.gloss_texture_output = 1
+                    else:
+                        self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorGroupColorParam].value
+                        self.gloss_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.GlossTexture].path))
+                        self.gloss_texture.deserialize()
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    self.alpha_texture = self.normal_texture
+                    self.alpha_texture_output = 1
+                    if not material.parameters[ShaderParameterName.CH1GlossMaskSwitchBool].value:
+                        self.gloss_texture = None
+                        self.gloss_color = material.parameters[ShaderParameterName.GlossA_floatVal].value
+                    if not material.parameters[ShaderParameterName.CH1OpacityMaskSwitchBool].value:
+                        self.alpha_texture = None
+                case "ch1diffnormglossalphaemissive": # radiator
+                    self.valid = True
+                    # self.has_diffuse_texture = True
+                    self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.DiffuseATexture].path))
+                    self.diffuse_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH1DiffColTextureSwitchBool].value:
+                        self.diffuse_texture = None
+                        self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorGroupColorParam].value
+                    self.gloss_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.GlossTexture].path))
+                    self.gloss_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH1GlossMaskSwitchBool].value:
+                        self.gloss_texture = None
+                        self.gloss_value = material.parameters[ShaderParameterName.GlossA_floatVal].value
+                    # self.has_normal = material.parameters[ShaderParameterName.CH1NormalMapSwitchBool].value
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    self.lcao_texture = self.normal_texture
+                    self.lcao_texture_output = 1
+                    if not material.parameters[ShaderParameterName.CH1NormalMapSwitchBool].value:
+                        self.normal_texture = None
+                        self.lcao_texture = None
+                    if not material.parameters[ShaderParameterName.CH1LocalAOSwitchBool].value:
+                        self.lcao_texture = None
+                        self.lcao_color = (1, 1, 1)
+                    self.alpha_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.AlphaTexture].path))
+                    self.alpha_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH1OpacityMaskSwitchBool].value:
+                        self.alpha_texture = None
+                case "clc_metalch2normalch1mask":
+                    self.valid = True
+                    self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.CH2DiffuseTextureTexture].path))
+                    self.diffuse_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+                        self.diffuse_color = material.parameters[ShaderParameterName.ColorGroupColorParam].value
+                    self.normal_texture_texcoord = "TEXCOORD1"
+                    self.normal_texture_tiling = material.parameters[ShaderParameterName.NormalTiling].value
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    self.lcao_texture_texcoord = self.normal_texture_texcoord
+                    self.lcao_texture = self.normal_texture
+                    self.lcao_texture_output = 1
+                    self.lcao_texture_tiling = self.normal_texture_tiling
+                    if not material.parameters[ShaderParameterName.LocalAOSwitchBool].value:
+                        self.lcao_texture = None
+                    if not material.parameters[ShaderParameterName.CH2NormalSwitchBool].value:
+                        self.normal_texture = None
+                case "ch2diffnormglossalphaemissive": # belt
+                    self.valid = True
+                    self.gloss_texture_texcoord = "TEXCOORD1"
+                    self.gloss_texture_tiling = (material.parameters[ShaderParameterName.uTile_floatVal].value, material.parameters[ShaderParameterName.vTile_floatVal].value)
+                    self.gloss_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.GlossTexture].path))
+                    self.gloss_texture.deserialize()
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorAColorParam].value
+                    if not material.parameters[ShaderParameterName.CH2GlossMaskSwitchBool].value:
+                        self.gloss_texture = None
+                    self.normal_texture_texcoord = self.gloss_texture_texcoord
+                    self.normal_texture_tiling = self.gloss_texture_tiling
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH2NormalMapSwitchBool].value:
+                        self.normal_texture = None
+                    self.alpha_texture_texcoord = self.gloss_texture_texcoord
+                    self.alpha_texture_tiling = self.gloss_texture_tiling
+                    self.alpha_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.AlphaTexture].path))
+                    self.alpha_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH2OpacityMaskSwitchBool].value:
+                        self.alpha_texture = None
+                case "ext_grille": # grill
+                    self.valid = True
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorGroupColorParam].value
+                    self.normal_texture_texcoord = "TEXCOORD1"
+                    self.normal_texture_tiling = material.parameters[ShaderParameterName.NormalTiling].value
+                    self.normal_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.NormalTexture].path))
+                    self.normal_texture.deserialize()
+                    self.gloss_invert = True # ???
+                    self.gloss_texture_texcoord = self.normal_texture_texcoord
+                    self.gloss_texture = self.normal_texture
+                    self.gloss_texture_output = 1
+                    self.gloss_texture_tiling = self.normal_texture_tiling
+                case "simplediffuse": # frame
+                    self.valid = True
+                    self.diffuse_color = material.parameters[ShaderParameterName.ColorColorParam].value
+                case "ch1ch2normlerpch1glossdiff": # splitter
+                    self.valid = True
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorAColorParam].value
+                    self.gloss_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.CH1GlossDiffMaskTexture].path))
+                    self.gloss_texture.deserialize()
+                    if not material.parameters[ShaderParameterName.CH1GlossMaskSwitchBool].value:
+                        self.gloss_texture = None
+                case "m_ch2normglossalphaemissive":
+                    self.valid = True
+                    # self.diffuse_color = (1, 1, 1, 1)
+                    self.diffuse_color = (0, 0, 0, 1)
+                    self.gloss_value = 0 # placeholder, metal mirror
+                case "undercarriage":
+                    self.valid = True
+                    self.diffuse_texture = Texture(path_resolver.resolve(material.parameters[ShaderParameterName.DiffuseATexture].path))
+                    self.diffuse_texture.deserialize()
+        elif shader_processor == 2:
+            self.valid = True
+            if ShaderParameterName.DiffuseATexture in material.parameters:
+                if material.parameters[ShaderParameterName.DiffuseATexture].path != "":
+                    self.diffuse_texture = Texture.from_path(material.parameters[ShaderParameterName.DiffuseATexture].path)
+                    if ShaderParameterName.DiffuseTextureSwitchBool in material.parameters:
+                        if not material.parameters[ShaderParameterName.DiffuseTextureSwitchBool].value:
+                            self.diffuse_texture = None
+                    elif ShaderParameterName.CH1DiffColTextureSwitchBool in material.parameters:
+                        # self.diffuse_texture_texcoord = "TEXCOORD1"
+                        if not material.parameters[ShaderParameterName.CH1DiffColTextureSwitchBool].value:
+                            self.diffuse_texture = None
+            elif ShaderParameterName.CH1DiffuseTextureTexture in material.parameters:
+                self.diffuse_texture = Texture.from_path(material.parameters[ShaderParameterName.CH1DiffuseTextureTexture].path)
+                if ShaderParameterName.UniqueBaseColorSwitchBool in material.parameters and material.parameters[ShaderParameterName.UniqueBaseColorSwitchBool].value and not material.parameters[ShaderParameterName.UniqueBaseTextureSwitchBool].value:
+                    self.diffuse_texture = None
+                elif ShaderParameterName.CH1DiffuseTextureSwitchBool in material.parameters:
+                    if not material.parameters[ShaderParameterName.CH1DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+                elif ShaderParameterName.DiffuseTextureSwitchBool in material.parameters:
+                    if not material.parameters[ShaderParameterName.DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+            elif ShaderParameterName.CH2DiffuseTextureTexture in material.parameters:
+                self.diffuse_texture = Texture.from_path(material.parameters[ShaderParameterName.CH2DiffuseTextureTexture].path)
+                self.diffuse_texture_texcoord = "TEXCOORD1"
+                if ShaderParameterName.uTile_floatVal in material.parameters and ShaderParameterName.vTile_floatVal in material.parameters:
+                    self.diffuse_texture_tiling = (material.parameters[ShaderParameterName.uTile_floatVal].value, material.parameters[ShaderParameterName.vTile_floatVal].value)
+                if ShaderParameterName.DiffuseTextureSwitchBool in material.parameters:
+                    if not material.parameters[ShaderParameterName.DiffuseTextureSwitchBool].value:
+                        self.diffuse_texture = None
+            self.diffuse_color = (0, 0, 0, 1)
+            if self.diffuse_texture is None:
+                if ShaderParameterName.DiffuseColorGroupColorParam in material.parameters:
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorGroupColorParam].value
+                elif ShaderParameterName.DiffuseColorAColorParam in material.parameters:
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorAColorParam].value
+                elif ShaderParameterName.ColorGroupColorParam in material.parameters:
+                    self.diffuse_color = material.parameters[ShaderParameterName.ColorGroupColorParam].value
+                elif ShaderParameterName.DiffuseColorColorParam in material.parameters:
+                    self.diffuse_color = material.parameters[ShaderParameterName.DiffuseColorColorParam].value
+                elif ShaderParameterName.UniqueBaseColorSwitchBool in material.parameters and material.parameters[ShaderParameterName.UniqueBaseColorSwitchBool].value:
+                    self.diffuse_color = material.parameters[ShaderParameterName.UniqueBaseColorColorParam].value
+                elif ShaderParameterName.ColorGroupSwitchBool in material.parameters:
+                    if material.parameters[ShaderParameterName.ColorGroupSwitchBool].value:
+                        self.diffuse_color = material.parameters[ShaderParameterName.PaintColorGroupColorParam].value
+                    else:
+                        self.diffuse_color = material.parameters[ShaderParameterName.PaintColorColorParam].value
+                elif ShaderParameterName.ColorColorParam in material.parameters:
+                    self.diffuse_color = material.parameters[ShaderParameterName.ColorColorParam].value
+
+# CommonModel::Pose?
+class Bone:
+    def __init__(self):
+        self.name = ""
+        self.transform = np.identity(4, np.float32) # local after deserialize, world after Skeleton.deserialize
+    
+    def deserialize(self, blob: Blob):
+        self.name_length = blob.stream.read_u32()
+        self.name = blob.stream.read(self.name_length).decode("utf-8")
+        self.parent_index = blob.stream.read_s16()
+        self.child_index = blob.stream.read_s16()
+        self.next_index = blob.stream.read_s16()
+        self.transform = blob.stream.read_array("f", 16).reshape(4, 4)
+
+class Skeleton:
+    def __init__(self):
+        self.bones_length = 0
+        self.bones = []
+        self.transforms = np.zeros((0, 4, 4), np.float32) # (n, 4, 4) world transforms, indexed by Mesh.bone_index
+    
+    def deserialize(self, blob: Blob):
+        self.bones_length = blob.stream.read_u16()
+        self.bones = [Bone() for _ in range(self.bones_length)]
+        for bone in self.bones:
+            bone.deserialize(blob)
+        local_transforms = np.array([bone.transform for bone in self.bones], np.float32).reshape(-1, 4, 4)
+        parent_indices = np.array([bone.parent_index for bone in self.bones], np.intp)
+        self.transforms = Skeleton.compose(local_transforms, parent_indices)
+        for bone, transform in zip(self.bones, self.transforms):
+            bone.transform = transform
+        # if blob.version.is_at_least(1, 0):
+        #     blob.stream.seek(blob.stream.read_u32(), os.SEEK_CUR)
+    
+    @staticmethod
+    def compose(local_transforms: np.ndarray, parent_indices: np.ndarray):
+        # world = local @ world[parent], one matrix multiplication per hierarchy depth instead of per bone
+        depths = np.zeros(len(parent_indices), np.intp)
+        ancestors = parent_indices.copy()
+        for _ in range(len(parent_indices)):
+            has_ancestor = ancestors != -1
+            if not has_ancestor.any():
+                break
+            depths[has_ancestor] += 1
+            ancestors[has_ancestor] = parent_indices[ancestors[has_ancestor]]
+        else:
+            if (ancestors != -1).any():
+                print("Warning: Skeleton has a parent cycle, its bones keep their local transforms.")
+                depths[ancestors != -1] = 0
+
+        world_transforms = local_transforms.copy()
+        for depth in range(1, int(depths.max(initial=0)) + 1):
+            bone_indices = np.flatnonzero(depths == depth)
+            world_transforms[bone_indices] = local_transforms[bone_indices] @ world_transforms[parent_indices[bone_indices]]
+        return world_transforms
+
+# Vertex decoding module
+class DXGI_FORMAT: # subset used by VertexLayout elements and ModelBuffer
+    R32G32B32_FLOAT = 6
+    R16G16B16A16_FLOAT = 10
+    R16G16B16A16_SNORM = 13
+    R10G10B10A2_UNORM = 24
+    R8G8B8A8_UNORM = 28
+    R16G16_UNORM = 35
+    R16G16_SNORM = 37
+
+vertex_element_types = { # DXGI_FORMAT -> (component type, components)
+    DXGI_FORMAT.R32G32B32_FLOAT: (np.dtype("<f4"), 3),
+    DXGI_FORMAT.R16G16B16A16_FLOAT: (np.dtype("<f2"), 4),
+    DXGI_FORMAT.R16G16B16A16_SNORM: (np.dtype("<i2"), 4),
+    DXGI_FORMAT.R10G10B10A2_UNORM: (np.dtype("<u4"), 1),
+    DXGI_FORMAT.R8G8B8A8_UNORM: (np.dtype("u1"), 4),
+    DXGI_FORMAT.R16G16_UNORM: (np.dtype("<u2"), 2),
+    DXGI_FORMAT.R16G16_SNORM: (np.dtype("<i2"), 2),
+}
+
+def vertex_element_size(format: int):
+    component_type, components = vertex_element_types[format]
+    return component_type.itemsize * components
+
+def vertex_element_view(buffer, offset: int, count: int, stride: int, format: int):
+    # (count, components) view of one element of every vertex; no data is copied
+    component_type, components = vertex_element_types[format]
+    return np.ndarray((count, components), component_type, buffer, offset, (stride, component_type.itemsize))
+
+def decode_vertex_element(view: np.ndarray, format: int):
+    match format:
+        case DXGI_FORMAT.R32G32B32_FLOAT | DXGI_FORMAT.R16G16B16A16_FLOAT:
+            return view.astype(np.float32)
+        case DXGI_FORMAT.R16G16B16A16_SNORM | DXGI_FORMAT.R16G16_SNORM:
+            return view / np.float32(32767)
+        case DXGI_FORMAT.R16G16_UNORM:
+            return view / np.float32(65535)
+        case DXGI_FORMAT.R8G8B8A8_UNORM:
+            return view / np.float32(255)
+        case DXGI_FORMAT.R10G10B10A2_UNORM:
+            packed = view[:, 0]
+            return np.stack((packed & 0x3FF, packed >> 10 & 0x3FF, packed >> 20 & 0x3FF, packed >> 30), axis=1) / np.array((1023, 1023, 1023, 3), np.float32)
+
+class MeshVertices: # decoded vertices [vertex_id_min, vertex_id_max] of a Mesh
+    def __init__(self):
+        self.positions = None # (n, 3) float32
+        self.normals = None # (n, 3) float32, None if there is no NORMAL0
+        self.colors = None # (n, 4) float32
+        self.uvs = [None] * 5 # (n, 2) float32 per TEXCOORDn
+        self.morph_channels = None # (weights, n, 3) float32 position deltas per morph weight index, when decode_morph_channels == True
+        self.morph_basis = None # (n, 3) float32 positions without the preset's morphs, what morph_channels apply to
+        self.morph_weights = None # (weights,) float32 the preset's weight per morph channel; basis + weights @ channels = positions
+        self.elements = {} # semantic name -> ((n, components) view of the vertex buffer, DXGI_FORMAT), undecoded; when keep_vertex_elements or raw_vertex_elements == True
+        self.dequantization = None # VertexDequantization when raw_vertex_elements == True; positions, normals, colors and uvs are None then
+
+    def slice(self, start: int, stop: int): # views of vertices [start, stop)
+        vertices = MeshVertices()
+        vertices.positions = None if self.positions is None else self.positions[start:stop]
+        vertices.normals = None if self.normals is None else self.normals[start:stop]
+        vertices.colors = None if self.colors is None else self.colors[start:stop]
+        vertices.uvs = [None if uv is None else uv[start:stop] for uv in self.uvs]
+        vertices.morph_channels = None if self.morph_channels is None else self.morph_channels[:, start:stop]
+        vertices.morph_basis = None if self.morph_basis is None else self.morph_basis[start:stop]
+        vertices.morph_weights = self.morph_weights
+        vertices.elements = {semantic_name: (view[start:stop], format) for semantic_name, (view, format) in self.elements.items()}
+        vertices.dequantization = self.dequantization
+        return vertices
+
+    def dequantize_elements(self, transform: np.ndarray = None):
+        # raw_vertex_elements == True: float vertices in element space and the 4x4 Object.matrix_world that places them
+        # transform: DecodedMesh.transform, the bone transform when bake_transforms == False, applied after the dequantization
+        # one multiply per component instead of the transform chain, the rest is on the matrix
+        vertices = MeshVertices()
+        dequantization = self.dequantization
+        view, format = self.elements.get("POSITION0", (None, -1))
+        position = decode_vertex_element(view, format)
+        vertices.positions = np.ascontiguousarray(position[:, :3])
+        view, format = self.elements.get("NORMAL0", (None, -1))
+        if format != -1:
+            vertices.normals = dequantization.element_normals(position, decode_vertex_element(view, format), format)
+        view, format = self.elements.get("COLOR0", (None, -1))
+        vertices.colors = decode_vertex_element(view, format) if format == DXGI_FORMAT.R8G8B8A8_UNORM else np.ones((len(position), 4), np.float32)
+        for i in range(5):
+            view, format = self.elements.get("TEXCOORD" + str(i), (None, -1))
+            vertices.uvs[i] = dequantization.uv(decode_vertex_element(view, format), i) if format == DXGI_FORMAT.R16G16_UNORM else np.zeros((len(position), 2), np.float32)
+        matrix_world = dequantization.position_matrix().T
+        if transform is not None:
+            matrix_world = np.asarray(transform, np.float32) @ matrix_world
+        return vertices, matrix_world
+
+    def decode(self, mesh: Mesh, vertex_layout: VertexLayout, vertex_buffers, morph_data_buffers, transform, vertex_id_min: int, vertex_id_max: int, weights = None, scale_x: float = 1):
+        return self.decode_variants(mesh, vertex_layout, vertex_buffers, morph_data_buffers, transform, vertex_id_min, vertex_id_max, [(weights, scale_x)])[0]
+
+    def decode_variants(self, mesh: Mesh, vertex_layout: VertexLayout, vertex_buffers, morph_data_buffers, transform, vertex_id_min: int, vertex_id_max: int, presets):
+        # one MeshVertices per (weights, scale_x) preset; colors and uvs are decoded once and shared
+        count = vertex_id_max - vertex_id_min + 1
+
+        vertex_buffer_offsets = [0 for _ in range(mesh.vertex_buffer_indices_length)]
+        columns = {} # semantic name -> (view, format)
+        for semantic_name, vertex_layout_element_desc in vertex_layout.elements.items():
+            if vertex_layout_element_desc.format not in vertex_element_types:
+                print(F"Error: Unexpected element format: {vertex_layout_element_desc.format}.")
+                continue
+            vertex_buffer_index = mesh.vertex_buffer_indices[vertex_layout_element_desc.input_slot]
+            vertex_buffer = vertex_buffers[vertex_buffer_index.id + 1]
+            offset = vertex_buffer_index.offset + (vertex_id_min + mesh.base_vertex_location) * vertex_buffer.stride + vertex_buffer_offsets[vertex_layout_element_desc.input_slot]
+            columns[semantic_name] = (vertex_element_view(vertex_buffer.stream, offset, count, vertex_buffer.stride, vertex_layout_element_desc.format), vertex_layout_element_desc.format)
+            vertex_buffer_offsets[vertex_layout_element_desc.input_slot] += vertex_element_size(vertex_layout_element_desc.format)
+
+        if raw_vertex_elements and not any(weights for weights, _ in presets):
+            # positions stay quantized, Mesh.scale, Mesh.translate, uv_transforms and the bone transform go along as parameters
+            dequantization = VertexDequantization(mesh, columns.get("POSITION0", (None, -1))[1], transform)
+            variants = [self] + [MeshVertices() for _ in presets[1:]]
+            for variant in variants:
+                variant.positions = None
+                variant.colors = None
+                variant.uvs = [None] * 5
+                variant.elements = columns
+                variant.dequantization = dequantization
+            return variants
+
+        view, format = columns.get("POSITION0", (None, -1))
+        if format == DXGI_FORMAT.R16G16B16A16_SNORM:
+            position = decode_vertex_element(view, format)
+            positions = position[:, :3] * np.array(mesh.scale[:3], np.float32) + np.array(mesh.translate[:3], np.float32)
+            position_w = position[:, 3]
+        elif format == DXGI_FORMAT.R32G32B32_FLOAT: # FH2
+            positions = decode_vertex_element(view, format)
+        else:
+            print("Error: Unexpected position format.")
+            positions = np.zeros((count, 3), np.float32)
+
+        view, format = columns.get("NORMAL0", (None, -1))
+        if format == DXGI_FORMAT.R16G16_SNORM: # model.decompress_flags
+            normal = decode_vertex_element(view, format)
+            normals = np.column_stack((position_w, normal))
+        elif format == DXGI_FORMAT.R16G16B16A16_FLOAT: # FH2
+            normals = decode_vertex_element(view, format)[:, :3]
+        else:
+            if format != -1:
+                print("Error: Unexpected normal format.")
+            normals = None
+
+        view, format = columns.get("COLOR0", (None, -1))
+        if format == DXGI_FORMAT.R8G8B8A8_UNORM:
+            self.colors = decode_vertex_element(view, format)
+        else:
+            if format != -1:
+                print("Error: Unexpected color format.")
+            self.colors = np.ones((count, 4), np.float32)
+
+        for i, uv_transform in enumerate(mesh.uv_transforms):
+            view, format = columns.get("TEXCOORD" + str(i), (None, -1))
+            if format == DXGI_FORMAT.R16G16_UNORM:
+                uv = decode_vertex_element(view, format)
+                uv[:, 0] = uv[:, 0] * uv_transform[0][1] + uv_transform[0][0]
+                uv[:, 1] = 1 - (uv[:, 1] * uv_transform[1][1] + uv_transform[1][0])
+                self.uvs[i] = uv
+            else:
+                if format != -1:
+                    print("Error: Unexpected texcoord format.")
+                self.uvs[i] = np.zeros((count, 2), np.float32)
+
+        morph_targets = None # (count, 2, morph_weights_count, 4): position deltas, then normal deltas; w is the weight index
+        if mesh.morph_weights_count > 0 and mesh.morph_data_buffer_id is not None and (decode_morph_channels or any(weights for weights, _ in presets)):
+            morph_data_buffer = morph_data_buffers[mesh.morph_data_buffer_id]
+            if morph_data_buffer.format == DXGI_FORMAT.R16G16B16A16_FLOAT:
+                morph_targets = np.ndarray((count, 2, mesh.morph_weights_count, 4), np.dtype("<f2"), morph_data_buffer.stream, (vertex_id_min + mesh.base_vertex_location) * morph_data_buffer.stride, (morph_data_buffer.stride, mesh.morph_weights_count * 8, 8, 2)).astype(np.float32)
+            else:
+                print("Error: Unexpected morph data format.")
+
+        if morph_targets is not None and any(weights for weights, _ in presets):
+            # all presets in one weighted sum: (presets, weights) -> (presets, count, 2, morph_weights_count) -> deltas (presets, count, 2, 3)
+            preset_weights = np.zeros((len(presets), max(len(weights) if weights else 0 for weights, _ in presets)), np.float32)
+            for i, (weights, _) in enumerate(presets):
+                if weights:
+                    preset_weights[i, :len(weights)] = weights
+            morph_weights = preset_weights[:, morph_targets[..., 3].astype(np.intp)]
+            preset_deltas = np.einsum("vstc,pvst->pvsc", morph_targets[..., :3], morph_weights)
+
+        if morph_targets is not None and decode_morph_channels:
+            # position deltas summed per weight index: (count, morph_weights_count) one-hot -> (weights, count, 3)
+            weight_indices = morph_targets[:, 0, :, 3].astype(np.intp)
+            one_hot = (weight_indices[..., None] == np.arange(weight_indices.max() + 1)).astype(np.float32)
+            channel_deltas = np.einsum("vtc,vtw->wvc", morph_targets[:, 0, :, :3], one_hot)
+
+        # bone transform (None - keep bone space) and Y-up, Left-handed -> Z-up, Right-handed as one 3x3 @ (n, 3)
+        if transform is None:
+            rotation = axis_conversion
+            translation = np.zeros(3, np.float32)
+        else:
+            transform = np.asarray(transform, np.float32)
+            rotation = transform[:3, :3] @ axis_conversion
+            translation = transform[3, :3] @ axis_conversion
+
+        variants = []
+        for i, (weights, scale_x) in enumerate(presets):
+            variant = self if i == 0 else MeshVertices()
+            variant.colors = self.colors
+            variant.uvs = list(self.uvs)
+            if keep_vertex_elements:
+                variant.elements = columns
+            variant_positions = positions
+            variant_normals = normals
+            if morph_targets is not None and weights:
+                variant_positions = positions + preset_deltas[i, :, 0]
+                variant_positions[:, 0] *= scale_x
+                if normals is not None:
+                    variant_normals = normals + preset_deltas[i, :, 1]
+                    variant_normals /= np.linalg.norm(variant_normals, axis=1, keepdims=True)
+                    variant_normals[:, 0] /= scale_x # n * transpose(invert(scale_x))
+            variant.positions = variant_positions @ rotation + translation
+            if morph_targets is not None and decode_morph_channels:
+                # unmorphed basis and channels in the same space, so the preset's geometry is the mix at morph_weights, not basis plus the keys again
+                scale = np.array((scale_x if weights else 1, 1, 1), np.float32) # scale_x applies to the morphed sum, so to basis and channels alike
+                variant.morph_basis = (positions * scale) @ rotation + translation
+                variant.morph_channels = (channel_deltas * scale) @ rotation
+                variant.morph_weights = np.zeros(len(channel_deltas), np.float32)
+                if weights:
+                    channel_weights = np.asarray(weights, np.float32)[: len(channel_deltas)]
+                    variant.morph_weights[: len(channel_weights)] = channel_weights
+            if variant_normals is not None:
+                variant_normals = variant_normals @ rotation
+                variant_normals /= np.linalg.norm(variant_normals, axis=1, keepdims=True) # located at the beginning of the pixel shader
+                variant.normals = variant_normals
+            variants.append(variant)
+        return variants
+
+axis_conversion = np.array(((-1, 0, 0), (0, 0, 1), (0, -1, 0)), np.float32) # v @ axis_conversion = (-x, -z, y)
+
+class VertexDequantization: # what MeshVertices.decode applies to MeshVertices.elements
+    def __init__(self, mesh: Mesh, position_format: int, transform = None):
+        # Mesh.scale and Mesh.translate only apply to R16G16B16A16_SNORM positions, FH2 float positions are used as they are
+        quantized = position_format == DXGI_FORMAT.R16G16B16A16_SNORM
+        self.position_scale = np.array(mesh.scale[:3] if quantized else (1, 1, 1), np.float32)
+        self.position_translate = np.array(mesh.translate[:3] if quantized else (0, 0, 0), np.float32)
+        self.uv_transforms = list(mesh.uv_transforms) # ((u offset, u scale), (v offset, v scale)) per TEXCOORDn, None before Mesh 1.5
+        self.transform = None if transform is None else np.asarray(transform, np.float32) # bone transform, row vectors; None when bake_transforms == False
+
+    def position_matrix(self):
+        # 4x4, row vectors: normalized element position (x, y, z, 1) -> Blender space; the determinant is negative, the game is left-handed
+        matrix = np.identity(4, np.float32)
+        matrix[:3, :3] = np.diag(self.position_scale)
+        matrix[3, :3] = self.position_translate
+        if self.transform is not None:
+            transform = self.transform.copy()
+            transform[:3, 3] = 0
+            transform[3, 3] = 1
+            matrix = matrix @ transform
+        conversion = np.identity(4, np.float32)
+        conversion[:3, :3] = axis_conversion
+        return matrix @ conversion
+
+    def element_normals(self, position: np.ndarray, normal: np.ndarray, format: int):
+        # decoded NORMAL0 in element space, that is before position_matrix: the inverse transpose of the scale, for a rigid bone transform
+        if format == DXGI_FORMAT.R16G16_SNORM:
+            normals = np.column_stack((position[:, 3], normal))
+        else: # FH2 R16G16B16A16_FLOAT
+            normals = normal[:, :3]
+        normals = normals * self.position_scale
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals
+
+    def uv(self, uv: np.ndarray, i: int, flip_v: bool = True):
+        # decoded R16G16_UNORM -> uv; flip_v: Blender's bottom-left origin instead of the top-left one of the game and glTF
+        uv_transform = self.uv_transforms[i] or ((0, 1), (0, 1))
+        uv = uv * np.array((uv_transform[0][1], uv_transform[1][1]), np.float32) + np.array((uv_transform[0][0], uv_transform[1][0]), np.float32)
+        if flip_v:
+            uv[:, 1] = 1 - uv[:, 1]
+        return uv
+
+def blender_transform(transform):
+    # row-vector bone transform in game space -> column-vector 4x4 for Blender's Object.matrix_world
+    conversion = np.identity(4, np.float32)
+    conversion[:3, :3] = axis_conversion
+    transform = np.array(transform, np.float32)
+    transform[:3, 3] = 0
+    transform[3, 3] = 1
+    return (conversion.T @ transform @ conversion).T
+
+# Model module
+class DecodedMesh: # bpy-free result of decode_modelbin, picklable
+    def __init__(self, name: str, vertices: MeshVertices, faces: np.ndarray, material: MaterialInstance, transform: np.ndarray = None, levels_of_detail: int = 0):
+        self.name = name
+        self.vertices = vertices
+        self.faces = faces
+        self.material = material
+        self.transform = transform # 4x4 Object.matrix_world when bake_transforms == False, else None
+        self.levels_of_detail = levels_of_detail # Mesh.levels_of_detail
+
+def level_of_detail_name(bit: int): # 0 -> "LODS", 1 -> "LOD0", ...
+    return "LODS" if bit == 0 else F"LOD{bit - 1}"
+
+def decode_modelbin(path: str, requested_level_of_detail: int = 1 << 0, requested_render_pass: int = 0xFFFF, weights = None, scale_x: float = 1):
+    return decode_modelbin_variants(path, requested_level_of_detail, requested_render_pass, [(weights, scale_x)])[0]
+
+def combine_levels_of_detail(requested_levels_of_detail): # [1 << 1, 1 << 2] -> 0b110
+    requested_level_of_detail = 0
+    for level_of_detail in requested_levels_of_detail:
+        requested_level_of_detail |= level_of_detail
+    return requested_level_of_detail
+
+def split_levels_of_detail(decoded_meshes, requested_levels_of_detail):
+    # a list of decoded meshes per LOD, meshes in several LODs are shared, not copied
+    return [[decoded_mesh for decoded_mesh in decoded_meshes if decoded_mesh.levels_of_detail & level_of_detail != 0] for level_of_detail in requested_levels_of_detail]
+
+def decode_modelbin_levels(path: str, requested_levels_of_detail, requested_render_pass: int = 0xFFFF, weights = None, scale_x: float = 1):
+    # one decode for several LODs, e.g. [1 << 1, 1 << 2]; vertex ranges shared between LODs are decoded once
+    decoded_meshes = decode_modelbin(path, combine_levels_of_detail(requested_levels_of_detail), requested_render_pass, weights, scale_x)
+    return split_levels_of_detail(decoded_meshes, requested_levels_of_detail)
+
+def decode_modelbin_variants_profiled(path: str, requested_level_of_detail: int = 1 << 0, requested_render_pass: int = 0xFFFF, presets = ((None, 1),)):
+    # for decode worker processes, profiler != None: the decoded variants and the records and counters of this file, handed over to the importing process
+    with profile_file(path):
+        variants = decode_modelbin_variants(path, requested_level_of_detail, requested_render_pass, presets)
+    return variants, profiler.take()
+
+def decode_modelbin_variants(path: str, requested_level_of_detail: int = 1 << 0, requested_render_pass: int = 0xFFFF, presets = ((None, 1),)):
+    # presets: [(weights, scale_x), ...]; returns a list of decoded meshes per preset, the bundle is parsed once
+    s = BinaryStream.from_path(path)
+
+    variants = [None] * len(presets)
+    cache_paths = [None] * len(presets)
+    bundle = None # parsed once, for cached materials and for the decode of missing presets
+    if mesh_cache_path is not None and not keep_vertex_elements and not raw_vertex_elements: # the cache doesn't store MeshVertices.elements
+        with profile("mesh cache"):
+            digest = hashlib.blake2b(s[:], digest_size=16).hexdigest() # once, not per preset
+        if use_materials:
+            bundle = Bundle()
+            with profile("deserialize"):
+                bundle.deserialize(s)
+        for i, (weights, scale_x) in enumerate(presets):
+            cache_paths[i] = mesh_cache_file(digest, requested_level_of_detail, requested_render_pass, weights, scale_x)
+            with profile("mesh cache"):
+                variants[i] = load_decoded_meshes(cache_paths[i], bundle)
+        if all(variant is not None for variant in variants):
+            return variants
+    missing = [i for i, variant in enumerate(variants) if variant is None]
+    presets = [presets[i] for i in missing]
+
+    if bundle is None:
+        bundle = Bundle()
+        with profile("deserialize"):
+            bundle.deserialize(s)
+
+    model_blobs = bundle.blobs[Tag.Modl]
+    if len(model_blobs) != 1:
+        print("Warning: Read unexpected number of 'Modl' entries. Expected [1].")
+    model_blob = model_blobs[0]
+    model = Model()
+    model.deserialize(model_blob)
+    if model.levels_of_detail & requested_level_of_detail == 0:
+        print(F"Error: Model has no requested LOD. Requested 0x{requested_level_of_detail:x}, Contained 0x{model.levels_of_detail:x}.")
+
+    skeleton_blobs = bundle.blobs[Tag.Skel]
+    if len(skeleton_blobs) != 1:
+        print("Warning: Read unexpected number of 'Skel' entries. Expected [1].")
+    skeleton_blob = skeleton_blobs[0]
+    skeleton = Skeleton()
+    skeleton.deserialize(skeleton_blob)
+
+    vertex_layout_blobs = bundle.blobs[Tag.VLay]
+    vertex_layout_blobs_length = len(vertex_layout_blobs)
+    if vertex_layout_blobs_length != model.vertex_layouts_length:
+        print(F"Warning: Read unexpected number of 'VLay' entries. Read [{vertex_layout_blobs_length}]. Expected [{model.vertex_layouts_length}].")
+    vertex_layouts = [VertexLayout() for _ in range(vertex_layout_blobs_length)]
+    for vertex_layout, vertex_layout_blob in zip(vertex_layouts, vertex_layout_blobs):
+        vertex_layout.deserialize(vertex_layout_blob.stream)
+
+    index_buffer_blobs = bundle.blobs[Tag.IndB]
+    if len(index_buffer_blobs) != 1:
+        print("Warning: Read unexpected number of 'IndB' entries. Expected [1].")
+    index_buffer = ModelBuffer()
+    index_buffer.deserialize(index_buffer_blobs[0])
+
+    mesh_blobs_length = len(bundle.blobs[Tag.Mesh])
+    if mesh_blobs_length != model.meshes_length:
+        print(F"Warning: Read unexpected number of 'Mesh' entries. Read [{mesh_blobs_length}]. Expected [{model.meshes_length}].")
+    model_index = ModelIndex(bundle)
+    meshes = model_index.select(requested_level_of_detail, requested_render_pass)
+
+    # only the buffers and materials of the selected meshes are deserialized, the others stay empty
+    vertex_buffer_ids = ModelIndex.vertex_buffer_ids(meshes)
+    vertex_buffer_blobs = bundle.blobs[Tag.VerB]
+    vertex_buffers = [ModelBuffer() for _ in range(len(vertex_buffer_blobs))]
+    for vertex_buffer_blob in vertex_buffer_blobs:
+        vertex_buffer_id = vertex_buffer_blob.metadata[Tag.Id].read_s32()
+        if vertex_buffer_id in vertex_buffer_ids:
+            vertex_buffers[vertex_buffer_id + 1].deserialize(vertex_buffer_blob)
+
+    morph_data_buffer_ids = ModelIndex.morph_data_buffer_ids(meshes) if decode_morph_channels or any(weights for weights, _ in presets) else set() # only read when morphs are applied
+    morph_data_buffers = defaultdict(ModelBuffer)
+    for morph_data_buffer_blob in bundle.blobs[Tag.MBuf]:
+        morph_data_buffer_id = morph_data_buffer_blob.metadata[Tag.Id].read_s32()
+        if morph_data_buffer_id in morph_data_buffer_ids:
+            morph_data_buffers[morph_data_buffer_id].deserialize(morph_data_buffer_blob)
+
+    material_blobs_length = len(bundle.blobs[Tag.MatI])
+    if material_blobs_length != model.materials_length:
+        print(F"Warning: Read unexpected number of 'MatI' entries. Read [{material_blobs_length}]. Expected [{model.materials_length}].")
+    with profile("materials"):
+        materials = read_materials(bundle, ModelIndex.material_ids(meshes))
+
+    indices = index_buffer.indices()
+    decoded_meshes = [[] for _ in presets]
+    material_ids = []
+
+    draws = [] # (mesh, faces, first, last): first and last are buffer vertex ids, vertex_id + base_vertex_location
+    vertex_ranges = defaultdict(list) # vertex_range_key -> [[first, last, mesh], ...]
+    for mesh in meshes:
+    #for mesh in [meshes[0]]:
+        with profile("indices", mesh.name):
+            draw_indices = indices[mesh.start_index_location : mesh.start_index_location + mesh.index_count] # mesh.index_buffer_id
+            vertex_id_min = int(draw_indices.min())
+            vertex_id_max = int(draw_indices.max())
+            faces = draw_indices[: mesh.index_count // 3 * 3].reshape(-1, 3)[:, (0, 2, 1)].astype(np.int32) - vertex_id_min # (A, B, C)->(A, C, B); Left-handed -> Right-handed coordinate system
+        first = vertex_id_min + mesh.base_vertex_location
+        last = vertex_id_max + mesh.base_vertex_location
+        draws.append((mesh, faces, first, last))
+        vertex_ranges[vertex_range_key(mesh)].append([first, last, mesh])
+
+    # LODs and render passes share vertices: decode every merged overlapping range once, meshes take slices
+    decoded_ranges = defaultdict(list) # vertex_range_key -> [(first, last, vertices_variants), ...]
+    for key, ranges in vertex_ranges.items():
+        merged = []
+        for first, last, mesh in sorted(ranges, key=lambda r: r[:2]):
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last, mesh])
+        for first, last, mesh in merged:
+            transform = skeleton.transforms[mesh.bone_index] if bake_transforms else None
+            with profile("vertices", mesh.name): # the first mesh of the range
+                vertices_variants = MeshVertices().decode_variants(mesh, vertex_layouts[mesh.vertex_layout_id], vertex_buffers, morph_data_buffers, transform, first - mesh.base_vertex_location, last - mesh.base_vertex_location, presets)
+            decoded_ranges[key].append((first, last, vertices_variants))
+    if profiler is not None: # vertices of the meshes, vertices actually decoded
+        requested_vertices = sum(last - first + 1 for _, _, first, last in draws)
+        decoded_vertices = sum(last - first + 1 for ranges in decoded_ranges.values() for first, last, _ in ranges)
+        profiler.count("mesh vertices", requested_vertices)
+        profiler.count("decoded vertices", decoded_vertices)
+        profiler.count("shared vertices", requested_vertices - decoded_vertices)
+
+    for mesh, faces, first, last in draws:
+        range_first, _, range_variants = next(r for r in decoded_ranges[vertex_range_key(mesh)] if r[0] <= first and last <= r[1])
+        vertices_variants = [vertices.slice(first - range_first, last - range_first + 1) for vertices in range_variants]
+        transform = skeleton.transforms[mesh.bone_index]
+
+        name = ""
+        #if mesh.render_pass >> 6 != 0:
+        #    name += str(mesh.render_pass >> 6)
+        #name += F"({(mesh.render_pass >> 5) & 1}{(mesh.render_pass >> 4) & 1}{(mesh.render_pass >> 3) & 1}{(mesh.render_pass >> 2) & 1}{(mesh.render_pass >> 1) & 1}{mesh.render_pass & 1})"
+        name += mesh.name
+        name += " " + materials[mesh.material_id].name
+        # if "COLOR0" not in vertex_layouts[mesh.vertex_layout_id].elements:
+        #     name += " [no color]"
+        #     # print(F"Mesh \"{name}\" has no COLOR0")
+        for variant, vertices in zip(decoded_meshes, vertices_variants):
+            variant.append(DecodedMesh(name, vertices, faces, materials[mesh.material_id], None if bake_transforms else blender_transform(transform), mesh.levels_of_detail))
+        material_ids.append(mesh.material_id)
+
+    for i, variant in zip(missing, decoded_meshes):
+        variants[i] = variant
+        if cache_paths[i] is not None:
+            with profile("mesh cache"):
+                save_decoded_meshes(cache_paths[i], variant, material_ids, materials)
+    return variants
+
+def vertex_range_key(mesh: Mesh):
+    # meshes with equal keys decode a buffer vertex id to the same vertex
+    return (mesh.vertex_layout_id, tuple((vertex_buffer_index.id, vertex_buffer_index.stride, vertex_buffer_index.offset) for vertex_buffer_index in mesh.vertex_buffer_indices),
+        tuple(mesh.uv_transforms), tuple(mesh.scale), tuple(mesh.translate),
+        mesh.morph_weights_count, mesh.morph_data_buffer_id, mesh.bone_index if bake_transforms else None)
+
+def read_materials(bundle: Bundle, material_ids = None):
+    # material_ids: deserialize only these, the others stay empty MaterialInstances; None - all
+    material_blobs = bundle.blobs[Tag.MatI]
+    materials = [MaterialInstance() for _ in range(len(material_blobs))]
+    for material_blob in material_blobs:
+        material_id = material_blob.metadata[Tag.Id].read_s32()
+        if material_ids is None or material_id in material_ids:
+            material_blob.stream.seek(0) # the cache loader may have read it already
+            materials[material_id].deserialize(material_blob)
+    return materials
+
+# Mesh cache module
+mesh_cache_version = 3 # bump when decoding changes, old files are ignored
+
+def mesh_cache_file(digest: str, requested_level_of_detail: int, requested_render_pass: int, weights = None, scale_x: float = 1):
+    # digest: content hash of the file, so renamed or copied files hit and edited ones miss
+    name = F"{digest}_{requested_level_of_detail:x}_{requested_render_pass:x}"
+    if weights:
+        name += "_" + hashlib.blake2b(repr((tuple(weights), scale_x)).encode(), digest_size=4).hexdigest()
+    if not bake_transforms:
+        name += "_local"
+    if decode_morph_channels:
+        name += "_morphs"
+    return os.path.join(mesh_cache_path, name + ".npz")
+
+def save_decoded_meshes(path: str, decoded_meshes, material_ids, materials):
+    # all meshes concatenated, split again by vertex_counts and face_counts
+    vertices = [decoded_mesh.vertices for decoded_mesh in decoded_meshes]
+    arrays = {
+        "version": np.array(mesh_cache_version),
+        "names": np.array([decoded_mesh.name for decoded_mesh in decoded_meshes], str),
+        "levels_of_detail": np.array([decoded_mesh.levels_of_detail for decoded_mesh in decoded_meshes], np.int32),
+        "material_ids": np.array(material_ids, np.int32),
+        "material_names": np.array([material.name for material in materials], str),
+        "vertex_counts": np.array([len(v.positions) for v in vertices], np.int64),
+        "face_counts": np.array([len(decoded_mesh.faces) for decoded_mesh in decoded_meshes], np.int64),
+        "has_normals": np.array([v.normals is not None for v in vertices], bool),
+        "positions": np.concatenate([v.positions for v in vertices] or [np.zeros((0, 3), np.float32)]),
+        "normals": np.concatenate([v.normals if v.normals is not None else np.zeros_like(v.positions) for v in vertices] or [np.zeros((0, 3), np.float32)]),
+        "colors": np.concatenate([v.colors for v in vertices] or [np.zeros((0, 4), np.float32)]),
+        "faces": np.concatenate([decoded_mesh.faces for decoded_mesh in decoded_meshes] or [np.zeros((0, 3), np.int32)]),
+    }
+    if not bake_transforms:
+        arrays["transforms"] = np.array([decoded_mesh.transform for decoded_mesh in decoded_meshes], np.float32).reshape(-1, 4, 4)
+    if decode_morph_channels: # (weights * n, 3) per mesh
+        arrays["morph_channel_counts"] = np.array([0 if v.morph_channels is None else len(v.morph_channels) for v in vertices], np.int64)
+        arrays["morph_channels"] = np.concatenate([v.morph_channels.reshape(-1, 3) for v in vertices if v.morph_channels is not None] or [np.zeros((0, 3), np.float32)])
+        arrays["morph_basis"] = np.concatenate([v.morph_basis for v in vertices if v.morph_channels is not None] or [np.zeros((0, 3), np.float32)])
+        arrays["morph_weights"] = np.concatenate([v.morph_weights for v in vertices if v.morph_channels is not None] or [np.zeros(0, np.float32)])
+    for i in range(5):
+        arrays[F"uv{i}"] = np.concatenate([v.uvs[i] for v in vertices] or [np.zeros((0, 2), np.float32)])
+    try:
+        os.makedirs(mesh_cache_path, exist_ok=True)
+        temporary_path = F"{path}.{os.getpid()}.tmp" # batch workers may write the same file
+        with open(temporary_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        print(F"Warning: Failed to write mesh cache \"{path}\": {e}")
+
+def load_decoded_meshes(path: str, bundle: Bundle | None):
+    # None on a miss; bundle: the parsed file, needed for materials when use_materials == True
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as f:
+            arrays = dict(f)
+    except Exception as e:
+        print(F"Warning: Failed to read mesh cache \"{path}\": {e}")
+        return None
+    if int(arrays["version"]) != mesh_cache_version:
+        return None
+
+    if use_materials:
+        materials = read_materials(bundle, {int(material_id) for material_id in arrays["material_ids"]})
+    else:
+        materials = [MaterialInstance() for _ in range(len(arrays["material_names"]))]
+        for material, name in zip(materials, arrays["material_names"]):
+            material.name = str(name)
+
+    decoded_meshes = []
+    vertex_start = 0
+    face_start = 0
+    transforms = arrays.get("transforms", [None] * len(arrays["names"]))
+    morph_channel_counts = arrays.get("morph_channel_counts", np.zeros(len(arrays["names"]), np.int64))
+    morph_channel_start = 0
+    morph_basis_start = 0
+    morph_weight_start = 0
+    for name, material_id, vertex_count, face_count, has_normals, transform, morph_channel_count, levels_of_detail in zip(arrays["names"], arrays["material_ids"], arrays["vertex_counts"], arrays["face_counts"], arrays["has_normals"], transforms, morph_channel_counts, arrays["levels_of_detail"]):
+        vertex_end = vertex_start + int(vertex_count)
+        face_end = face_start + int(face_count)
+        vertices = MeshVertices()
+        vertices.positions = arrays["positions"][vertex_start:vertex_end]
+        vertices.normals = arrays["normals"][vertex_start:vertex_end] if has_normals else None
+        vertices.colors = arrays["colors"][vertex_start:vertex_end]
+        vertices.uvs = [arrays[F"uv{i}"][vertex_start:vertex_end] for i in range(5)]
+        if morph_channel_count != 0:
+            morph_channel_end = morph_channel_start + int(morph_channel_count * vertex_count)
+            vertices.morph_channels = arrays["morph_channels"][morph_channel_start:morph_channel_end].reshape(int(morph_channel_count), int(vertex_count), 3)
+            vertices.morph_basis = arrays["morph_basis"][morph_basis_start : morph_basis_start + int(vertex_count)]
+            vertices.morph_weights = arrays["morph_weights"][morph_weight_start : morph_weight_start + int(morph_channel_count)]
+            morph_channel_start = morph_channel_end
+            morph_basis_start += int(vertex_count)
+            morph_weight_start += int(morph_channel_count)
+        decoded_meshes.append(DecodedMesh(str(name), vertices, arrays["faces"][face_start:face_end], materials[material_id], transform, int(levels_of_detail)))
+        vertex_start = vertex_end
+        face_start = face_end
+    return decoded_meshes
+
+if __name__ == "__main__":
+    # python modelbin.py [--profile] [--index] <file.modelbin>... - print decoded meshes, with --profile the decode phase timings
+    # --index: the LODs and render passes of the files instead, no geometry is decoded
+    paths = sys.argv[1:]
+    if "--profile" in paths:
+        paths.remove("--profile")
+        profiler = Profiler()
+    list_index = "--index" in paths
+    if list_index:
+        paths.remove("--index")
+    for path in paths:
+        print(path)
+        if list_index:
+            bundle = Bundle()
+            bundle.deserialize(BinaryStream.from_path(path))
+            for bit, meshes_length, triangles, render_passes in ModelIndex(bundle).summary():
+                print(F"  {level_of_detail_name(bit)} (1 << {bit}): {meshes_length} meshes, {triangles} triangles, render passes {', '.join(F'0x{render_pass:x}' for render_pass in render_passes)}")
+            continue
+        with profile_file(path):
+            decoded_meshes = decode_modelbin(path, 0xFFFF)
+        for decoded_mesh in decoded_meshes:
+            print(F"  {decoded_mesh.name}: {len(decoded_mesh.vertices.positions)} vertices, {len(decoded_mesh.faces)} faces")
+    if profiler is not None:
+        profiler.print_summary()
@@ -0,0 +1,158 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import modelbin
+from modelbin import Tag
+import modelbin_synthetic
+
+try:
+    import resource
+except ImportError:
+    resource = None # Windows: no peak RSS, the traced peak is still reported
+
+# Decode benchmark on synthetic bundles, no game data needed
+# python modelbin_benchmark.py --vertices 100000 --meshes 8 --lods 6 --repeat 5 --json results.json
+
+class ParsedModel: # the parts of a bundle that mesh and index decoding need
+    def __init__(self, stream: modelbin.BinaryStream):
+        bundle = modelbin.Bundle()
+        bundle.deserialize(stream)
+        self.vertex_layouts = [modelbin.VertexLayout() for _ in bundle.blobs[Tag.VLay]]
+        for vertex_layout, vertex_layout_blob in zip(self.vertex_layouts, bundle.blobs[Tag.VLay]):
+            vertex_layout.deserialize(vertex_layout_blob.stream)
+        self.index_buffer = modelbin.ModelBuffer()
+        self.index_buffer.deserialize(bundle.blobs[Tag.IndB][0])
+        self.vertex_buffers = [modelbin.ModelBuffer() for _ in bundle.blobs[Tag.VerB]]
+        for vertex_buffer_blob in bundle.blobs[Tag.VerB]:
+            self.vertex_buffers[vertex_buffer_blob.metadata[Tag.Id].read_s32() + 1].deserialize(vertex_buffer_blob)
+        self.morph_data_buffers = {}
+        for morph_data_buffer_blob in bundle.blobs[Tag.MBuf]:
+            morph_data_buffer = modelbin.ModelBuffer()
+            morph_data_buffer.deserialize(morph_data_buffer_blob)
+            self.morph_data_buffers[morph_data_buffer_blob.metadata[Tag.Id].read_s32()] = morph_data_buffer
+        self.meshes = [modelbin.Mesh() for _ in bundle.blobs[Tag.Mesh]]
+        for mesh, mesh_blob in zip(self.meshes, bundle.blobs[Tag.Mesh]):
+            mesh.deserialize(mesh_blob)
+
+def bench_deserialize(data: bytes):
+    def run():
+        stream = modelbin.BinaryStream(data)
+        bundle = modelbin.Bundle()
+        bundle.deserialize(stream)
+        for mesh_blob in bundle.blobs[Tag.Mesh]: # metadata and data are lazy, Mesh blobs are what every decode touches
+            modelbin.Mesh().deserialize(mesh_blob)
+    return run
+
+def bench_indices(data: bytes):
+    model = ParsedModel(modelbin.BinaryStream(data))
+    def run():
+        indices = model.index_buffer.indices()
+        for mesh in model.meshes:
+            draw_indices = indices[mesh.start_index_location : mesh.start_index_location + mesh.index_count]
+            vertex_id_min = int(draw_indices.min())
+            draw_indices[: mesh.index_count // 3 * 3].reshape(-1, 3)[:, (0, 2, 1)].astype("int32") - vertex_id_min
+    return run
+
+def bench_vertices(data: bytes, weights = None):
+    model = ParsedModel(modelbin.BinaryStream(data))
+    indices = model.index_buffer.indices()
+    ranges = []
+    for mesh in model.meshes:
+        draw_indices = indices[mesh.start_index_location : mesh.start_index_location + mesh.index_count]
+        ranges.append((mesh, int(draw_indices.min()), int(draw_indices.max())))
+    def run():
+        for mesh, vertex_id_min, vertex_id_max in ranges:
+            modelbin.MeshVertices().decode(mesh, model.vertex_layouts[mesh.vertex_layout_id], model.vertex_buffers, model.morph_data_buffers, None, vertex_id_min, vertex_id_max, weights)
+    return run
+
+def bench_decode_modelbin(path: str, weights = None):
+    def run():
+        modelbin.decode_modelbin(path, 0xFFFF, 0xFFFF, weights)
+    return run
+
+benchmarks = { # name -> setup(path, data, weights) -> run()
+    "deserialize": lambda path, data, weights: bench_deserialize(data),
+    "indices": lambda path, data, weights: bench_indices(data),
+    "vertices": lambda path, data, weights: bench_vertices(data, weights),
+    "decode_modelbin": lambda path, data, weights: bench_decode_modelbin(path, weights),
+}
+
+def peak_rss():
+    # bytes; ru_maxrss is in KiB on Linux, in bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def run_benchmark(name: str, path: str, vertex_count: int, repeat: int, weights = None):
+    # runs in a fresh worker process, so the peak RSS belongs to this benchmark alone
+    modelbin.use_materials = False
+    modelbin.mesh_cache_path = None
+    with open(path, "rb") as f:
+        data = f.read()
+    run = benchmarks[name](path, data, weights)
+    run() # warm-up: page cache, lazy imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times)
+    return {
+        "benchmark": name,
+        "best_seconds": best,
+        "mean_seconds": sum(times) / len(times),
+        "vertices_per_second": vertex_count / best if best > 0 else None,
+        "traced_peak_bytes": traced_peak,
+        "peak_rss_bytes": peak_rss(),
+    }
+
+def benchmark_modelbin(vertices: int = 100000, meshes: int = 8, levels_of_detail: int = 6, materials: int = 1, morph_weights: int = 0,
+        mesh_version = (1, 9), bundle_version = (1, 1), repeat: int = 5, names = tuple(benchmarks), directory: str | None = None):
+    # vertices/s is the referenced vertex count of all meshes over the best time
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        path = os.path.join(directory or temporary_directory, F"synthetic_{vertices}_{meshes}_{levels_of_detail}_{mesh_version[0]}.{mesh_version[1]}.modelbin")
+        vertex_count = modelbin_synthetic.generate_modelbin(path, vertices, meshes, levels_of_detail, materials, morph_weights, mesh_version, bundle_version)
+        size = os.path.getsize(path)
+        print(F"{os.path.basename(path)}: {size / (1 << 20):.1f} MiB, {vertex_count} vertices, {meshes * levels_of_detail} meshes.")
+        weights = (0.5,) * morph_weights if morph_weights else None
+        results = []
+        for name in names:
+            with ProcessPoolExecutor(1) as executor:
+                result = executor.submit(run_benchmark, name, path, vertex_count, repeat, weights).result()
+            rss = "-" if result["peak_rss_bytes"] is None else F"{result['peak_rss_bytes'] / (1 << 20):.1f}"
+            print(F"  {name:<16}{result['best_seconds'] * 1000:>10.2f} ms{result['vertices_per_second'] / 1e6:>10.2f} Mvertices/s  peak traced {result['traced_peak_bytes'] / (1 << 20):.1f} MiB, peak RSS {rss} MiB")
+            results.append(result)
+    return {
+        "vertices": vertices, "meshes": meshes, "levels_of_detail": levels_of_detail, "materials": materials, "morph_weights": morph_weights,
+        "mesh_version": "%d.%d" % mesh_version, "bundle_version": "%d.%d" % bundle_version, "file_size": size, "vertex_count": vertex_count,
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark modelbin.py decoding on a synthetic bundle.")
+    parser.add_argument("--vertices", type=int, default=100000, help="vertices of a LOD0 mesh (default: 100000)")
+    parser.add_argument("--meshes", type=int, default=8, help="parts, each has one mesh per LOD (default: 8)")
+    parser.add_argument("--lods", type=int, default=6, help="LOD0, LOD1, ... (default: 6)")
+    parser.add_argument("--materials", type=int, default=1, help="MatI blobs (default: 1)")
+    parser.add_argument("--morph-weights", type=int, default=0, help="morph weights per mesh, applied at 0.5 each (default: 0)")
+    parser.add_argument("--mesh-version", type=modelbin_synthetic.parse_version, default=(1, 9), help="Mesh blob version (default: 1.9)")
+    parser.add_argument("--bundle-version", type=modelbin_synthetic.parse_version, default=(1, 1), help="Grub version (default: 1.1)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark, the best one counts (default: 5)")
+    parser.add_argument("--benchmark", action="append", choices=list(benchmarks), help="run only these (default: all)")
+    parser.add_argument("--keep", metavar="DIRECTORY", help="write the synthetic bundle here instead of a temporary folder")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+    report = benchmark_modelbin(args.vertices, args.meshes, args.lods, args.materials, args.morph_weights, args.mesh_version, args.bundle_version, args.repeat, args.benchmark or tuple(benchmarks), args.keep)
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
@@ -0,0 +1,281 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import numpy as np
+import os
+import struct
+import time
+
+import modelbin
+from modelbin import DXGI_FORMAT
+
+# Headless .modelbin -> .glb converter, no Blender process per file
+# python modelbin_gltf.py D:\games\rips\OpusDev\media\cars\koe_one_15 D:\export\glb --workers 8
+
+class ComponentType: # glTF accessor.componentType
+    BYTE = 5120
+    UNSIGNED_BYTE = 5121
+    SHORT = 5122
+    UNSIGNED_SHORT = 5123
+    UNSIGNED_INT = 5125
+    FLOAT = 5126
+
+component_types = {
+    np.dtype("i1"): ComponentType.BYTE,
+    np.dtype("u1"): ComponentType.UNSIGNED_BYTE,
+    np.dtype("<i2"): ComponentType.SHORT,
+    np.dtype("<u2"): ComponentType.UNSIGNED_SHORT,
+    np.dtype("<u4"): ComponentType.UNSIGNED_INT,
+    np.dtype("<f4"): ComponentType.FLOAT,
+}
+
+accessor_types = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+# Blender (Z-up) -> glTF (Y-up), both right-handed: v @ blender_to_gltf = (x, z, -y)
+blender_to_gltf = np.array(((1, 0, 0), (0, 0, -1), (0, 1, 0)), np.float32)
+
+def gltf_matrix(transform: np.ndarray):
+    # Blender Object.matrix_world (column vectors) -> glTF node.matrix, column-major
+    conversion = np.identity(4, np.float32)
+    conversion[:3, :3] = blender_to_gltf.T
+    return (conversion @ transform @ conversion.T).T.ravel().tolist()
+
+def gltf_dequantization_matrix(dequantization: modelbin.VertexDequantization, transform: np.ndarray = None):
+    # element space -> glTF space as node.matrix; row vectors, so the row-major values are the column-major ones
+    # transform: DecodedMesh.transform (column vectors), the bone transform when bake_transforms == False
+    conversion = np.identity(4, np.float32)
+    conversion[:3, :3] = blender_to_gltf
+    matrix = dequantization.position_matrix()
+    if transform is not None:
+        matrix = matrix @ np.asarray(transform, np.float32).T
+    return (matrix @ conversion).ravel().tolist()
+
+class GlbBuilder:
+    def __init__(self):
+        self.json = {
+            "asset": {"version": "2.0", "generator": "ForzaTools modelbin_gltf.py"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self.chunks = [] # binary chunk parts, each 4-byte aligned
+        self.size = 0
+        self.materials = {} # MaterialInstance name -> material index
+        self.extensions = set() # extensionsUsed, all of them are required
+
+    def add_view(self, data: bytes, target: int | None = None, byte_stride: int | None = None):
+        view = {"buffer": 0, "byteOffset": self.size, "byteLength": len(data)}
+        if target is not None:
+            view["target"] = target
+        if byte_stride is not None:
+            view["byteStride"] = byte_stride
+        self.chunks.append(data)
+        self.size += len(data)
+        padding = -len(data) % 4
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.size += padding
+        self.json["bufferViews"].append(view)
+        return len(self.json["bufferViews"]) - 1
+
+    def add_accessor(self, array: np.ndarray, target: int | None = ARRAY_BUFFER, normalized: bool = False, bounds: bool = False, components: int | None = None):
+        # array: (n,) or (n, components) of a glTF component type; written as is, no conversion
+        # components: read only the first ones of every row, e.g. xyz of 8-byte quantized positions
+        array = np.ascontiguousarray(array)
+        row_components = 1 if array.ndim == 1 else array.shape[1]
+        components = components or row_components
+        accessor = {
+            "bufferView": self.add_view(array.tobytes(), target, array.strides[0] if components != row_components else None),
+            "componentType": component_types[array.dtype],
+            "count": len(array),
+            "type": accessor_types[components],
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if bounds and len(array) != 0: # required for POSITION; integer values for quantized accessors
+            bounded = array if components == row_components else array[:, :components]
+            accessor["min"] = np.atleast_1d(bounded.min(axis=0)).tolist()
+            accessor["max"] = np.atleast_1d(bounded.max(axis=0)).tolist()
+        self.json["accessors"].append(accessor)
+        return len(self.json["accessors"]) - 1
+
+    def add_material(self, material: modelbin.MaterialInstance):
+        # textures are DDS, which core glTF doesn't take; only the name and the diffuse color
+        index = self.materials.get(material.name)
+        if index is None:
+            gltf_material = {"name": material.name, "pbrMetallicRoughness": {"baseColorFactor": list(material.diffuse_color), "metallicFactor": 0}}
+            self.json["materials"].append(gltf_material)
+            index = self.materials[material.name] = len(self.json["materials"]) - 1
+        return index
+
+    def add_quantized_attributes(self, vertices: modelbin.MeshVertices):
+        # raw_vertex_elements == True: accessors straight from the vertex elements, the dequantization is on the node
+        dequantization = vertices.dequantization
+        attributes = {}
+        position_view, position_format = vertices.elements.get("POSITION0", (None, -1))
+        if position_format == DXGI_FORMAT.R16G16B16A16_SNORM:
+            attributes["POSITION"] = self.add_accessor(position_view, normalized=True, bounds=True, components=3) # w is the normal x
+            self.extensions.add("KHR_mesh_quantization")
+        else: # FH2 R32G32B32_FLOAT
+            attributes["POSITION"] = self.add_accessor(position_view, bounds=True)
+
+        view, format = vertices.elements.get("NORMAL0", (None, -1))
+        uniform_scale = (dequantization.position_scale == dequantization.position_scale[0]).all()
+        if format == DXGI_FORMAT.R16G16_SNORM and position_format == DXGI_FORMAT.R16G16B16A16_SNORM and uniform_scale:
+            normals = np.zeros((len(view), 4), "<i2") # xyz and padding, vertex attributes are 4-byte aligned
+            normals[:, 0] = position_view[:, 3]
+            normals[:, 1:3] = view
+            attributes["NORMAL"] = self.add_accessor(normals, normalized=True, components=3)
+            self.extensions.add("KHR_mesh_quantization")
+        elif format != -1:
+            position = modelbin.decode_vertex_element(position_view, position_format)
+            attributes["NORMAL"] = self.add_accessor(dequantization.element_normals(position, modelbin.decode_vertex_element(view, format), format).astype(np.float32))
+
+        for i in range(5):
+            view, format = vertices.elements.get("TEXCOORD" + str(i), (None, -1))
+            if format != DXGI_FORMAT.R16G16_UNORM:
+                continue
+            if dequantization.uv_transforms[i] in (None, ((0, 1), (0, 1))):
+                attributes["TEXCOORD_" + str(i)] = self.add_accessor(view, normalized=True) # glTF has the game's top-left UV origin
+            else:
+                attributes["TEXCOORD_" + str(i)] = self.add_accessor(dequantization.uv(modelbin.decode_vertex_element(view, format), i, flip_v=False))
+
+        view, format = vertices.elements.get("COLOR0", (None, -1))
+        if format == DXGI_FORMAT.R8G8B8A8_UNORM:
+            attributes["COLOR_0"] = self.add_accessor(view, normalized=True)
+        return attributes
+
+    def add_mesh(self, decoded_mesh: modelbin.DecodedMesh):
+        vertices = decoded_mesh.vertices
+        if vertices.dequantization is not None:
+            self.add_primitive(decoded_mesh, self.add_quantized_attributes(vertices), gltf_dequantization_matrix(vertices.dequantization, decoded_mesh.transform))
+            return
+        positions = vertices.positions if vertices.morph_channels is None else vertices.morph_basis # morph targets apply to the unmorphed positions
+        attributes = {"POSITION": self.add_accessor((positions @ blender_to_gltf).astype(np.float32), bounds=True)}
+        if vertices.normals is not None:
+            attributes["NORMAL"] = self.add_accessor((vertices.normals @ blender_to_gltf).astype(np.float32))
+        for i, uv in enumerate(vertices.uvs):
+            if "TEXCOORD" + str(i) in vertices.elements or not vertices.elements and uv.any():
+                gltf_uv = uv.astype(np.float32) # glTF has D3D's top-left UV origin, Blender's is bottom-left
+                gltf_uv[:, 1] = 1 - gltf_uv[:, 1]
+                attributes["TEXCOORD_" + str(i)] = self.add_accessor(gltf_uv)
+        view, format = vertices.elements.get("COLOR0", (None, -1))
+        if format == DXGI_FORMAT.R8G8B8A8_UNORM:
+            attributes["COLOR_0"] = self.add_accessor(view, normalized=True) # the vertex buffer bytes as they are
+        elif not vertices.elements:
+            attributes["COLOR_0"] = self.add_accessor(vertices.colors.astype(np.float32))
+        self.add_primitive(decoded_mesh, attributes, None if decoded_mesh.transform is None else gltf_matrix(np.asarray(decoded_mesh.transform, np.float32)))
+
+    def add_primitive(self, decoded_mesh: modelbin.DecodedMesh, attributes, matrix):
+        # faces keep their winding also under the mirroring dequantization matrix, glTF flips it for a negative determinant
+        vertices = decoded_mesh.vertices
+        faces = decoded_mesh.faces.ravel()
+        vertex_count = self.json["accessors"][attributes["POSITION"]]["count"]
+        primitive = {
+            "attributes": attributes,
+            "indices": self.add_accessor(faces.astype(np.uint16 if vertex_count <= 0xFFFF else np.uint32), ELEMENT_ARRAY_BUFFER),
+            "mode": 4, # TRIANGLES
+        }
+        if decoded_mesh.material.valid or decoded_mesh.material.name != "":
+            primitive["material"] = self.add_material(decoded_mesh.material)
+        gltf_mesh = {"name": decoded_mesh.name, "primitives": [primitive]}
+        if vertices.morph_channels is not None: # decode_morph_channels == True
+            primitive["targets"] = [{"POSITION": self.add_accessor((deltas @ blender_to_gltf).astype(np.float32), bounds=True)} for deltas in vertices.morph_channels]
+            gltf_mesh["weights"] = vertices.morph_weights.tolist() # the preset's, 0 without weights
+            gltf_mesh["extras"] = {"targetNames": [F"weight {i}" for i in range(len(vertices.morph_channels))]}
+        self.json["meshes"].append(gltf_mesh)
+
+        node = {"name": decoded_mesh.name, "mesh": len(self.json["meshes"]) - 1}
+        if matrix is not None: # bake_transforms == False, or raw_vertex_elements == True
+            node["matrix"] = matrix
+        self.json["nodes"].append(node)
+        self.json["scenes"][0]["nodes"].append(len(self.json["nodes"]) - 1)
+
+    def write(self, path: str):
+        self.json["buffers"].append({"byteLength": self.size})
+        if self.extensions:
+            self.json["extensionsUsed"] = sorted(self.extensions)
+            self.json["extensionsRequired"] = sorted(self.extensions)
+        for key in ("meshes", "materials", "accessors", "bufferViews"):
+            if not self.json[key]:
+                del self.json[key]
+        json_chunk = json.dumps(self.json, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        length = 12 + 8 + len(json_chunk) + 8 + self.size
+        with open(path, "wb") as f:
+            f.write(struct.pack("<III", 0x46546C67, 2, length)) # 'glTF'
+            f.write(struct.pack("<II", len(json_chunk), 0x4E4F534A)) # 'JSON'
+            f.write(json_chunk)
+            f.write(struct.pack("<II", self.size, 0x004E4942)) # 'BIN\0'
+            for chunk in self.chunks:
+                f.write(chunk)
+        return length
+
+def export_glb(decoded_meshes, path: str):
+    builder = GlbBuilder()
+    for decoded_mesh in decoded_meshes:
+        builder.add_mesh(decoded_mesh)
+    return builder.write(path)
+
+def configure_exporter(game_path: str | None = None, shader_processor: int = 1, bake_transforms: bool = True, morph_targets: bool = False, quantized: bool = False):
+    # also the initializer of the export worker processes
+    modelbin.use_materials = game_path is not None
+    if game_path is not None:
+        modelbin.path_resolver = modelbin.GamePathResolver(game_path)
+    modelbin.shader_processor = shader_processor
+    modelbin.bake_transforms = bake_transforms
+    modelbin.decode_morph_channels = morph_targets
+    modelbin.keep_vertex_elements = True
+    modelbin.raw_vertex_elements = quantized
+
+def export_modelbin(source_path: str, destination_path: str, requested_level_of_detail: int = 0x3, requested_render_pass: int = 0xFFFF):
+    os.makedirs(os.path.dirname(destination_path) or ".", exist_ok=True)
+    decoded_meshes = modelbin.decode_modelbin(source_path, requested_level_of_detail, requested_render_pass)
+    return export_glb(decoded_meshes, destination_path)
+
+def export_modelbins(source: str, destination: str, workers: int | None = None, requested_level_of_detail: int = 0x3, requested_render_pass: int = 0xFFFF,
+        game_path: str | None = None, bake_transforms: bool = True, morph_targets: bool = False, quantized: bool = False):
+    paths = [source] if os.path.isfile(source) else modelbin.find_files(source, ".modelbin")
+    print(F"Exporting {len(paths)} modelbin files from \"{source}\".")
+    written = [0, 0, 0] # files, bytes, errors
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=configure_exporter, initargs=(game_path, 1, bake_transforms, morph_targets, quantized)) as executor:
+        futures = []
+        for source_path in paths:
+            relative_path = os.path.basename(source_path) if source_path == source else os.path.relpath(source_path, source)
+            destination_path = os.path.join(destination, os.path.splitext(relative_path)[0] + ".glb")
+            futures.append(executor.submit(export_modelbin, source_path, destination_path, requested_level_of_detail, requested_render_pass))
+        for source_path, future in zip(paths, futures):
+            try:
+                written[1] += future.result()
+                written[0] += 1
+            except Exception as e:
+                print(F"Error: Failed to export \"{source_path}\": {e}")
+                written[2] += 1
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    files, size, errors = written
+    print(F"Exported {files} files, {size / (1 << 20):.1f} MiB in {elapsed:.2f} s: {files / elapsed:.1f} files/s. Errors: {errors}.")
+    return files, size, errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a .modelbin, or every .modelbin under a folder, to .glb.")
+    parser.add_argument("source", help=".modelbin file or game rip folder")
+    parser.add_argument("destination", help="output folder, the source folder structure is kept")
+    parser.add_argument("--workers", type=int, default=None, help="conversion processes (default: os.cpu_count())")
+    parser.add_argument("--lod", type=lambda text: int(text, 0), default=0x3, help="requested LOD mask, 1 << 0 - LODS, 1 << 1 - LOD0, ... (default: 0x3)")
+    parser.add_argument("--render-pass", type=lambda text: int(text, 0), default=0xFFFF, help="requested render pass mask (default: 0xFFFF)")
+    parser.add_argument("--game-path", help="game rip root, resolves materials; without it only material names are exported")
+    parser.add_argument("--bone-space", action="store_true", help="keep vertices in bone space and put the bone transforms on the nodes")
+    parser.add_argument("--morph-targets", action="store_true", help="one morph target per morph weight")
+    parser.add_argument("--quantized", action="store_true", help="keep the game's vertex encodings (KHR_mesh_quantization), the dequantization goes on the nodes; no morph targets")
+    args = parser.parse_args()
+    export_modelbins(args.source, args.destination, args.workers, args.lod, args.render_pass, args.game_path, not args.bone_space, args.morph_targets, args.quantized)
@@ -0,0 +1,227 @@
+import argparse
+import numpy as np
+import struct
+
+import modelbin
+from modelbin import DXGI_FORMAT, Tag
+
+# Synthetic .modelbin (Grub bundle) writer, valid input for modelbin.py without game data
+# python modelbin_synthetic.py out.modelbin --vertices 100000 --meshes 8 --lods 6 --mesh-version 1.9
+
+class SyntheticBlob:
+    def __init__(self, tag: int, version, data: bytes, metadata = ()):
+        self.tag = tag
+        self.version = version # (major, minor)
+        self.data = data
+        self.metadata = list(metadata) # [(tag, version, bytes), ...]
+
+def id_metadata(id: int):
+    return (Tag.Id, 0, struct.pack("<i", id))
+
+def name_metadata(name: str):
+    return (Tag.Name, 0, name.encode("utf-8"))
+
+def align(data: bytearray, alignment: int = 4):
+    data += bytes(-len(data) % alignment)
+
+def bundle_data(blobs, version = (1, 1)):
+    # header, blob table, metadata of all blobs, then the blob data; the layout Bundle.deserialize and Bundle.read_header expect
+    table_offset = 0x14 if version >= (1, 1) else 0x10
+    data = bytearray(table_offset + modelbin.Blob.header.size * len(blobs))
+    metadata_offsets = []
+    for blob in blobs:
+        metadata_offsets.append(len(data))
+        headers_offset = len(data)
+        data += bytes(modelbin.Metadata.header.size * len(blob.metadata))
+        for i, (tag, metadata_version, value) in enumerate(blob.metadata):
+            header_offset = headers_offset + modelbin.Metadata.header.size * i
+            modelbin.Metadata.header.pack_into(data, header_offset, tag, len(value) << 4 | metadata_version & 0xF, len(data) - header_offset)
+            data += value
+    align(data)
+    header_size = len(data)
+    for blob, metadata_offset, i in zip(blobs, metadata_offsets, range(len(blobs))):
+        data_offset = len(data)
+        data += blob.data
+        align(data)
+        struct.pack_into("<IBBHIIII", data, table_offset + modelbin.Blob.header.size * i, blob.tag, blob.version[0], blob.version[1], len(blob.metadata), metadata_offset, data_offset, len(blob.data), len(blob.data))
+    struct.pack_into("<IBB", data, 0, Tag.Grub, version[0], version[1])
+    if version >= (1, 1):
+        struct.pack_into("<HIII", data, 6, 0, header_size, len(data), len(blobs))
+    else:
+        struct.pack_into("<HII", data, 6, len(blobs), header_size, len(data))
+    return bytes(data)
+
+def write_bundle(path: str, blobs, version = (1, 1)):
+    data = bundle_data(blobs, version)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+def model_buffer(tag: int, id: int, data: bytes, length: int, stride: int, format: int):
+    header = struct.pack("<IIHBBI", length, len(data), stride, 1, 0, format)
+    return SyntheticBlob(tag, (1, 0), header + data, [id_metadata(id)])
+
+def vertex_layout(elements):
+    # elements: [(semantic name, semantic index, input slot, DXGI_FORMAT), ...]
+    names = list(dict.fromkeys(name for name, _, _, _ in elements))
+    data = bytearray(struct.pack("<H", len(names)))
+    for name in names:
+        data += struct.pack("<I", len(name)) + name.encode("utf-8")
+    data += struct.pack("<H", len(elements))
+    for name, semantic_index, input_slot, format in elements:
+        data += struct.pack("<HHHHIII", names.index(name), semantic_index, input_slot, 0, format, 0xFFFFFFFF, 0) # aligned byte offset: D3D12_APPEND_ALIGNED_ELEMENT
+    return SyntheticBlob(Tag.VLay, (1, 1), bytes(data))
+
+def grid(count: int, rng: np.random.Generator):
+    # about count vertices on a bumpy (side x side) grid in [-1, 1]; positions, normals, uvs and faces
+    side = max(2, int(round(count ** 0.5)))
+    u, v = np.meshgrid(np.linspace(0, 1, side, dtype=np.float32), np.linspace(0, 1, side, dtype=np.float32))
+    positions = np.column_stack((u.ravel() * 2 - 1, v.ravel() * 2 - 1, rng.uniform(-0.05, 0.05, side * side).astype(np.float32)))
+    normals = np.column_stack((np.zeros((side * side, 2), np.float32), np.ones(side * side, np.float32)))
+    uvs = np.column_stack((u.ravel(), v.ravel()))
+    corners = (np.arange(side - 1)[None, :] + np.arange(side - 1)[:, None] * side).ravel()
+    faces = np.concatenate((np.column_stack((corners, corners + 1, corners + side)), np.column_stack((corners + 1, corners + side + 1, corners + side))))
+    return positions, normals, uvs, faces
+
+def snorm16(values: np.ndarray):
+    return np.round(np.clip(values, -1, 1) * 32767).astype("<i2")
+
+def unorm16(values: np.ndarray):
+    return np.round(np.clip(values, 0, 1) * 65535).astype("<u2")
+
+def generate_modelbin(path: str, vertices: int = 10000, meshes: int = 4, levels_of_detail: int = 1, materials: int = 1,
+        morph_weights: int = 0, mesh_version = (1, 9), bundle_version = (1, 1), seed: int = 0, bone_transform: np.ndarray = None):
+    # meshes parts in levels_of_detail LODs (LOD0 = 1 << 1, ...); LOD n of a part has about vertices >> n vertices
+    # mesh_version >= (1, 8): quantized positions (R16G16B16A16_SNORM with Mesh.scale and Mesh.translate), older: float positions (FH2)
+    # bone_transform: 4x4 row-vector transform of the root bone all meshes use, None - identity
+    # returns the referenced vertex count, the sum of all meshes
+    rng = np.random.default_rng(seed)
+    quantized = mesh_version >= (1, 8)
+    use_uvs = mesh_version >= (1, 5) # Mesh.uv_transforms
+    morph_weights = morph_weights if mesh_version >= (1, 4) else 0 # Mesh.morph_data_buffer_id
+
+    elements = [("POSITION", 0, 0, DXGI_FORMAT.R16G16B16A16_SNORM if quantized else DXGI_FORMAT.R32G32B32_FLOAT)]
+    elements.append(("NORMAL", 0, 1, DXGI_FORMAT.R16G16_SNORM if quantized else DXGI_FORMAT.R16G16B16A16_FLOAT))
+    if use_uvs:
+        elements += [("TEXCOORD", 0, 1, DXGI_FORMAT.R16G16_UNORM), ("TEXCOORD", 1, 1, DXGI_FORMAT.R16G16_UNORM)]
+    elements.append(("COLOR", 0, 1, DXGI_FORMAT.R8G8B8A8_UNORM))
+    position_dtype = np.dtype([("position", "<i2", 4)] if quantized else [("position", "<f4", 3)])
+    attribute_dtype = np.dtype([("normal", "<i2", 2)] if quantized else [("normal", "<f2", 4)])
+    if use_uvs:
+        attribute_dtype = np.dtype(attribute_dtype.descr + [("uv0", "<u2", 2), ("uv1", "<u2", 2)])
+    attribute_dtype = np.dtype(attribute_dtype.descr + [("color", "u1", 4)])
+
+    draws = [] # (part, lod, base vertex location, start index location, index count)
+    position_data = []
+    attribute_data = []
+    morph_data = []
+    index_data = []
+    vertex_count = 0
+    index_count = 0
+    for part in range(meshes):
+        for lod in range(levels_of_detail):
+            positions, normals, uvs, faces = grid(max(4, vertices >> lod), rng)
+            positions[:, 2] += part # parts side by side
+            count = len(positions)
+            position_rows = np.zeros(count, position_dtype)
+            attribute_rows = np.zeros(count, attribute_dtype)
+            if quantized:
+                position_rows["position"][:, :3] = snorm16(positions - (0, 0, part)) # Mesh.scale = 1, Mesh.translate = (0, 0, part)
+                position_rows["position"][:, 3] = snorm16(normals[:, 0]) # normal x
+                attribute_rows["normal"] = snorm16(normals[:, 1:])
+            else:
+                position_rows["position"] = positions
+                attribute_rows["normal"][:, :3] = normals
+            if use_uvs:
+                attribute_rows["uv0"] = unorm16(uvs)
+                attribute_rows["uv1"] = unorm16(uvs)
+            attribute_rows["color"] = rng.integers(0, 256, (count, 4), np.uint8)
+            position_data.append(position_rows)
+            attribute_data.append(attribute_rows)
+            if morph_weights:
+                morph = np.zeros((count, 2, morph_weights, 4), "<f2") # position deltas, normal deltas; w is the weight index
+                morph[:, 0, :, :3] = rng.uniform(-0.01, 0.01, (count, morph_weights, 3))
+                morph[:, :, :, 3] = np.arange(morph_weights)
+                morph_data.append(morph)
+            index_data.append(faces.ravel())
+            draws.append((part, lod, vertex_count, index_count, faces.size))
+            vertex_count += count
+            index_count += faces.size
+
+    indices = np.concatenate(index_data)
+    index_stride = 2 if indices.max() < 0xFFFF else 4 # indices are relative to Mesh.base_vertex_location
+    blobs = []
+    blobs.append(SyntheticBlob(Tag.Modl, (1, 2), struct.pack("<hhhhIHB", len(draws), 1 + 2 + (1 if morph_weights else 0), 1, materials, 0, ((1 << levels_of_detail) - 1) << 1, 0)))
+    blobs.append(SyntheticBlob(Tag.Skel, (1, 0), struct.pack("<H", 1) + struct.pack("<I", 4) + b"root" + struct.pack("<hhh", -1, -1, -1) + np.asarray(np.identity(4) if bone_transform is None else bone_transform, "<f4").tobytes()))
+    material_data = bundle_data([SyntheticBlob(Tag.MTPR, (2, 1), struct.pack("<H", 0))]) # an embedded material bundle without a parent or parameters
+    for i in range(materials):
+        blobs.append(SyntheticBlob(Tag.MatI, (1, 0), material_data, [name_metadata(F"material{i}"), id_metadata(i)]))
+    blobs.append(vertex_layout(elements))
+    blobs.append(model_buffer(Tag.IndB, 0, indices.astype("<u2" if index_stride == 2 else "<u4").tobytes(), len(indices), index_stride, 57 if index_stride == 2 else 42)) # DXGI_FORMAT_R16_UINT, DXGI_FORMAT_R32_UINT
+    blobs.append(model_buffer(Tag.VerB, -1, np.concatenate(position_data).tobytes(), vertex_count, position_dtype.itemsize, elements[0][3]))
+    blobs.append(model_buffer(Tag.VerB, 0, np.concatenate(attribute_data).tobytes(), vertex_count, attribute_dtype.itemsize, 0))
+    morph_stride = morph_weights * 2 * 8
+    if morph_weights:
+        blobs.append(model_buffer(Tag.MBuf, 0, np.concatenate(morph_data).tobytes(), vertex_count, morph_stride, DXGI_FORMAT.R16G16B16A16_FLOAT))
+
+    uv_transforms = struct.pack("<4f", 0, 1, 0, 1) * 5 # ((u offset, u scale), (v offset, v scale))
+    for part, lod, base_vertex_location, start_index_location, draw_index_count in draws:
+        data = bytearray()
+        material_id = part % materials
+        data += struct.pack("<4h", -1, material_id, -1, -1) if mesh_version >= (1, 9) else struct.pack("<h", material_id)
+        data += struct.pack("<hHBBHB", 0, 1 << (lod + 1), 0, 255, 0x1 | 0x10, 0) # bone, LOD flags, LOD levels, render pass (opaque, not shadow), bucket order
+        if mesh_version >= (1, 2):
+            data += struct.pack("<BB", 0, morph_weights)
+        if mesh_version >= (1, 3):
+            data += struct.pack("<?", bool(morph_weights))
+        data += struct.pack("<?H", index_stride == 4, 4) # 32-bit indices, triangle list
+        data += struct.pack("<iiiiii", 0, 0, start_index_location, base_vertex_location, draw_index_count, draw_index_count // 3)
+        if mesh_version >= (1, 6):
+            data += struct.pack("<fI", 0.65, vertex_count)
+        data += struct.pack("<I", 0) # vertex layout
+        data += struct.pack("<I", 2)
+        data += struct.pack("<iiii", -1, 0, position_dtype.itemsize, 0)
+        data += struct.pack("<iiii", 0, 1, attribute_dtype.itemsize, 0)
+        if mesh_version >= (1, 4):
+            data += struct.pack("<ii", 0 if morph_weights else -1, -1)
+        data += struct.pack("<I", 0) # constant buffers
+        if mesh_version >= (1, 1):
+            data += struct.pack("<I", part)
+        if mesh_version >= (1, 5):
+            data += uv_transforms
+        if mesh_version >= (1, 8):
+            data += struct.pack("<4f", 1, 1, 1, 1) + struct.pack("<4f", 0, 0, part, 0)
+        blobs.append(SyntheticBlob(Tag.Mesh, mesh_version, bytes(data), [name_metadata(F"part{part}_LOD{lod}")]))
+
+    write_bundle(path, blobs, bundle_version)
+    return vertex_count
+
+def example_bone_transform():
+    # rigid, row vectors: 30 degrees about Y, then a translation
+    angle = np.radians(30)
+    transform = np.identity(4, np.float32)
+    transform[0, 0] = transform[2, 2] = np.cos(angle)
+    transform[0, 2] = -np.sin(angle)
+    transform[2, 0] = np.sin(angle)
+    transform[3, :3] = (1.5, -0.5, 2)
+    return transform
+
+def parse_version(text: str):
+    major, minor = text.split(".")
+    return int(major), int(minor)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic .modelbin.")
+    parser.add_argument("path")
+    parser.add_argument("--vertices", type=int, default=10000, help="vertices of a LOD0 mesh (default: 10000)")
+    parser.add_argument("--meshes", type=int, default=4, help="parts, each has one mesh per LOD (default: 4)")
+    parser.add_argument("--lods", type=int, default=1, help="LOD0, LOD1, ... (default: 1)")
+    parser.add_argument("--materials", type=int, default=1, help="MatI blobs (default: 1)")
+    parser.add_argument("--morph-weights", type=int, default=0, help="morph weights per mesh, adds an MBuf blob (default: 0)")
+    parser.add_argument("--mesh-version", type=parse_version, default=(1, 9), help="Mesh blob version (default: 1.9)")
+    parser.add_argument("--bundle-version", type=parse_version, default=(1, 1), help="Grub version (default: 1.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bone", action="store_true", help="rotate and move the root bone, for bone transform checks (default: identity)")
+    args = parser.parse_args()
+    vertex_count = generate_modelbin(args.path, args.vertices, args.meshes, args.lods, args.materials, args.morph_weights, args.mesh_version, args.bundle_version, args.seed, example_bone_transform() if args.bone else None)
+    print(F"Wrote \"{args.path}\": {vertex_count} vertices.")
@@ -0,0 +1,83 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+import modelbin
+
+# Bulk .swatchbin -> .dds converter for a whole game rip folder
+# python swatchbin_export.py D:\games\rips\OpusDev\media D:\export\dds --workers 8 --max-in-flight 256
+
+class InFlightLimiter: # blocks submission while more than max_bytes of source files are being converted
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size: int):
+        with self.condition:
+            # a file larger than the limit is still converted, alone
+            self.condition.wait_for(lambda: self.bytes == 0 or self.bytes + size <= self.max_bytes)
+            self.bytes += size
+
+    def release(self, size: int):
+        with self.condition:
+            self.bytes -= size
+            self.condition.notify_all()
+
+def export_swatchbin(source_path: str, destination_path: str):
+    # written next to the destination and renamed on success, no partial files are left behind
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    temporary_path = destination_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            _, size = modelbin.Texture.extract(source_path, f)
+        os.replace(temporary_path, destination_path)
+    except Exception:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return size
+
+def export_swatchbins(source: str, destination: str, workers: int | None = None, max_in_flight: int = 256 * 1024 * 1024):
+    paths = modelbin.find_files(source, ".swatchbin")
+    print(F"Exporting {len(paths)} swatchbin files from \"{source}\".")
+    limiter = InFlightLimiter(max_in_flight)
+    lock = threading.Lock()
+    written = [0, 0, 0] # files, bytes, errors
+
+    def export(source_path: str, size: int):
+        try:
+            destination_path = os.path.join(destination, os.path.splitext(os.path.relpath(source_path, source))[0] + ".dds")
+            dds_size = export_swatchbin(source_path, destination_path)
+            with lock:
+                written[0] += 1
+                written[1] += dds_size
+        except Exception as e:
+            print(F"Error: Failed to export \"{source_path}\": {e}")
+            with lock:
+                written[2] += 1
+        finally:
+            limiter.release(size)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        for source_path in paths:
+            size = os.path.getsize(source_path)
+            limiter.acquire(size)
+            executor.submit(export, source_path, size)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    files, size, errors = written
+    print(F"Exported {files} files, {size / (1 << 20):.1f} MiB in {elapsed:.2f} s: {files / elapsed:.1f} files/s, {size / (1 << 20) / elapsed:.1f} MiB/s. Errors: {errors}.")
+    return files, size, errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert every .swatchbin under a folder to .dds.")
+    parser.add_argument("source", help="game rip folder")
+    parser.add_argument("destination", help="output folder, the source folder structure is kept")
+    parser.add_argument("--workers", type=int, default=None, help="conversion threads (default: Python's ThreadPoolExecutor default)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="MiB of source files being converted at once (default: 256)")
+    args = parser.parse_args()
+    export_swatchbins(args.source, args.destination, args.workers, args.max_in_flight << 20)